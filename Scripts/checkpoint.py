@@ -0,0 +1,54 @@
+import json
+import os
+
+# Suffix of the progress file written next to the uploaded source file
+CHECKPOINT_SUFFIX = ".upload.json"
+
+class Checkpoint:
+    # Committed-row progress of one upload, stored in a small JSON file beside the source
+    def __init__(self, path, fingerprint, rows=0):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.rows = rows
+
+    @staticmethod
+    def for_upload(source_path, schema, table_name, mode):
+        # Load the checkpoint for this source/target, starting over if the file or target changed
+        stat = os.stat(source_path)
+        fingerprint = {
+            "source": os.path.abspath(source_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "schema": schema,
+            "table": table_name,
+            "mode": mode,
+        }
+        path = source_path + CHECKPOINT_SUFFIX
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return Checkpoint(path, fingerprint)
+
+        if saved.get("fingerprint") != fingerprint:
+            return Checkpoint(path, fingerprint)
+        return Checkpoint(path, fingerprint, int(saved.get("rows", 0)))
+
+    def save(self, rows):
+        # Record that the first `rows` rows are committed (written atomically);
+        # if the folder is read-only the upload continues without being resumable
+        self.rows = rows
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"fingerprint": self.fingerprint, "rows": rows}, file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def clear(self):
+        # Forget the progress once the upload has finished
+        self.rows = 0
+        if os.path.isfile(self.path):
+            os.remove(self.path)
@@ -1,5 +1,5 @@
 import os
-from Scripts.file_handler import FileHandler
+from Scripts.file_handler import COMPRESSION_LEVELS, DATA_EXTENSIONS, FileHandler
 from Scripts.database import Database
 
 class CLI:
@@ -130,7 +130,7 @@ class CLI:
                 return path
 
     @staticmethod
-    def get_files(target=".csv"):
+    def get_files(target=DATA_EXTENSIONS):
         # Let user select folder and get matching files
         while True:
             path = CLI.get_path()
@@ -142,6 +142,28 @@ class CLI:
                 return files
             print("No files found.")
 
+    @staticmethod
+    def get_compression():
+        # Prompt for a CSV compression codec and level; returns (codec or None, level), or None to cancel
+        codec = CLI.get_choice("Choose a compression", ["Uncompressed", *COMPRESSION_LEVELS], "Cancel")
+        if codec is None:
+            return None
+        if codec == "Uncompressed":
+            return None, None
+
+        low, high, default = COMPRESSION_LEVELS[codec]
+        while True:
+            raw = input(f"Enter compression level {low}-{high} (default: {default}): ").strip()
+            if not raw:
+                return codec, default
+            try:
+                level = int(raw)
+                if low <= level <= high:
+                    return codec, level
+            except ValueError:
+                pass
+            print("Invalid level.")
+
     @staticmethod
     def get_table_name(file_name, fallback_name="default_table"):
         # Prompt for a table name; allow skip
@@ -173,7 +195,8 @@ class CLI:
                     new_name = CLI.get_table_name(os.path.basename(initial_path))
                     if not new_name:
                         continue
-                    initial_path = os.path.join(os.path.dirname(initial_path), f"{new_name}.csv")
+                    ext = FileHandler.split_extension(initial_path)[1]
+                    initial_path = os.path.join(os.path.dirname(initial_path), f"{new_name}{ext}")
 
                 case "Replace":
                     return initial_path
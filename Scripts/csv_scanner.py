@@ -0,0 +1,128 @@
+import os
+import numpy as np
+
+# Bytes read per block while scanning for record boundaries
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Bytes per read when copying a byte range into a part file
+COPY_BUFFER_SIZE = 1024 * 1024
+
+QUOTE = ord('"')
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+
+# Contents of a line pandas skips as blank (skip_blank_lines)
+BLANK_LINES = (b"", b"\r")
+
+class CsvScanner:
+    @staticmethod
+    def scan(file_path, every):
+        # Find record boundaries in an uncompressed CSV without parsing any values. Newlines inside
+        # quoted fields are skipped by tracking quote parity ("" escapes flip it twice), and blank lines
+        # are not counted, matching what pandas parses. Returns (header_end, boundaries, rows): the byte offset after the header line, the byte offsets
+        # where data records every, 2*every, ... start, and the number of data records
+        size = os.path.getsize(file_path)
+        header_end = None
+        boundaries = []
+        rows = 0
+        inside = 0
+        carry = b""
+        position = 0
+
+        with open(file_path, "rb") as file:
+            while True:
+                block = file.read(SCAN_BLOCK_SIZE)
+                if not block:
+                    break
+
+                ends, inside, carry = CsvScanner._record_ends(block, inside, carry)
+
+                # Offsets just past each record's newline, i.e. where the next record starts
+                ends = ends + position + 1
+                if header_end is None and len(ends):
+                    header_end = int(ends[0])
+                    ends = ends[1:]
+
+                # Record number rows + j + 1 starts at ends[j]; keep those that are multiples of every
+                boundaries.extend(ends[(-rows - 1) % every::every].tolist())
+                rows += len(ends)
+                position += len(block)
+
+        if header_end is None:
+            return size, [], 0
+
+        # A final record without a trailing newline still counts
+        if carry not in BLANK_LINES:
+            rows += 1
+        # Drop boundaries past the last record (at the end of the file or before trailing blank lines)
+        return header_end, boundaries[:max(0, (rows - 1) // every)], rows
+
+    @staticmethod
+    def _record_ends(block, inside, carry=b""):
+        # Positions of the newlines in block that end a non-blank record, whether the block ends inside
+        # quotes, and the first bytes of the unfinished last record (carry, passed on to the next block)
+        buf = np.frombuffer(block, dtype=np.uint8)
+        ends = np.flatnonzero(buf == NEWLINE)
+        # Blocks without quotes (and not inside a quoted field) need no parity pass
+        if inside or block.find(b'"') != -1:
+            # A running count modulo 256 keeps the parity and fits in one byte per position
+            quotes = np.cumsum(buf == QUOTE, dtype=np.uint8)
+            ends = ends[((quotes[ends] + inside) & 1) == 0]
+            inside = (int(quotes[-1]) + inside) & 1
+
+        if not len(ends):
+            return ends, inside, (carry + block[:2])[:2]
+
+        # A line is blank when nothing (or a lone \r) precedes its newline; the first line may have
+        # started in the previous block
+        blank = np.zeros(len(ends), dtype=bool)
+        blank[0] = (carry + block[:min(int(ends[0]), 2)])[:2] in BLANK_LINES
+        lengths = np.diff(ends) - 1
+        blank[1:] = (lengths == 0) | ((lengths == 1) & (buf[ends[1:] - 1] == CARRIAGE_RETURN))
+        return ends[~blank], inside, block[int(ends[-1]) + 1:int(ends[-1]) + 3]
+
+    @staticmethod
+    def advance(file_path, offset, records):
+        # Byte offset just past `records` non-blank records starting at `offset` (a record start, outside
+        # quotes), or the file size if it has fewer
+        if records <= 0:
+            return offset
+
+        inside = 0
+        carry = b""
+        position = offset
+        with open(file_path, "rb") as file:
+            file.seek(offset)
+            while True:
+                block = file.read(SCAN_BLOCK_SIZE)
+                if not block:
+                    return position
+
+                ends, inside, carry = CsvScanner._record_ends(block, inside, carry)
+                if len(ends) >= records:
+                    return position + int(ends[records - 1]) + 1
+                records -= len(ends)
+                position += len(block)
+
+    @staticmethod
+    def copy_records(file_path, header_end, start, end, dest_path):
+        # Copy the header plus the records between two (offset, records to skip) positions,
+        # resolving both positions first (runs in a worker process)
+        start_offset = CsvScanner.advance(file_path, *start)
+        end_offset = CsvScanner.advance(file_path, *end)
+        return CsvScanner.copy_range(file_path, header_end, start_offset, end_offset, dest_path)
+
+    @staticmethod
+    def copy_range(file_path, header_end, start, end, dest_path):
+        # Write the header followed by bytes [start, end) of file_path to dest_path (runs in a worker process)
+        with open(file_path, "rb") as src, open(dest_path, "wb") as dest:
+            dest.write(src.read(header_end))
+            src.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                data = src.read(min(COPY_BUFFER_SIZE, remaining))
+                if not data:
+                    break
+                dest.write(data)
+                remaining -= len(data)
+        return dest_path
@@ -1,15 +1,26 @@
 import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from Scripts.checkpoint import Checkpoint
 from Scripts.cli import CLI
 from Scripts.database import Database
-from Scripts.file_handler import FileHandler
+from Scripts.file_handler import DATA_EXTENSIONS, EXPORT_EXTENSIONS, FileHandler
+
+# Default number of files/tables processed concurrently
+DEFAULT_WORKERS = 4
 
 class DataManager:
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, workers=DEFAULT_WORKERS):
         self.db = db
+        self.workers = workers
+        self._stop = threading.Event()
 
     def handle_upload(self):
-        # Let user select .csv file(s) to upload
-        files = CLI.get_files(".csv")
+        # Let user select CSV, Parquet or Feather file(s) to upload
+        files = CLI.get_files(DATA_EXTENSIONS)
 
         rename_action = True
         while True:
@@ -29,10 +40,11 @@ class DataManager:
             if rename_action is not None:
                 break
 
-        # Begin processing files
+        # Resolve every table name and conflict up front so uploads never wait on input
+        jobs = []
+        planned = set()
         for file_path in files:
             file_name = os.path.basename(file_path)
-            df = FileHandler.read_csv(file_path)
 
             table_name = CLI.get_table_name(file_name) if rename_action else FileHandler.normalize_name(file_name)
             if not table_name:
@@ -40,14 +52,22 @@ class DataManager:
                 continue
 
             conflict_action = "replace"
+            options = {}
 
             # Handle table name conflict
-            while self.db.table_exists(table_name):
-                action = CLI.get_choice(
-                    f"Table '{table_name}' already exists. Choose an action",
-                    ["Rename", "Append", "Replace"],
-                    "Skip"
-                )
+            while table_name in planned or self.db.table_exists(table_name):
+                if table_name in planned:
+                    action = CLI.get_choice(
+                        f"Table '{table_name}' is already used by another selected file. Choose an action",
+                        ["Rename"],
+                        "Skip"
+                    )
+                else:
+                    action = CLI.get_choice(
+                        f"Table '{table_name}' already exists. Choose an action",
+                        ["Rename", "Append", "Replace", "Merge", "Sync"],
+                        "Skip"
+                    )
 
                 if not action:
                     print(f"Skipping '{file_name}'.")
@@ -65,17 +85,140 @@ class DataManager:
                     if CLI.confirm(f"Are you sure you want to overwrite '{table_name}'?"):
                         conflict_action = "replace"
                         break
+                elif action in ("Merge", "Sync"):
+                    key_columns = CLI.get_choice(
+                        "Select key column(s) to match rows on",
+                        FileHandler.read_columns(file_path),
+                        "Back",
+                        allow_multiple=True
+                    )
+                    if not key_columns:
+                        continue
+
+                    options = {"key_columns": key_columns}
+                    if action == "Sync":
+                        delete_missing = CLI.confirm("Delete table rows that are not in the file?", allow_cancel=True)
+                        if delete_missing is None:
+                            continue
+                        options["delete_missing"] = delete_missing
+                    conflict_action = action.lower()
+                    break
+
+            if not table_name:
+                continue
+
+            # Key and index layout is only asked when tables are set up one by one
+            if rename_action and conflict_action in ("replace", "append"):
+                options.update(self._choose_indexes(file_path, table_name, conflict_action))
+
+            # Offer to resume an interrupted upload of the same file into the same table
+            if conflict_action in ("replace", "append"):
+                checkpoint = Checkpoint.for_upload(file_path, self.db.get_schema(), table_name, conflict_action)
+                if checkpoint.rows and not CLI.confirm(
+                    f"'{file_name}' was interrupted after {checkpoint.rows} rows. Resume?"
+                ):
+                    checkpoint.clear()
+                options["checkpoint"] = checkpoint
 
-            if table_name:
+            planned.add(table_name)
+            jobs.append((file_path, table_name, conflict_action, options))
+
+        if not jobs:
+            return
+
+        # Check bulk-load support once on the main connection before workers start
+        self.db.local_infile_enabled()
+        self._stop.clear()
+
+        workers = min(self.workers, len(jobs))
+        if workers <= 1:
+            for job in jobs:
                 try:
-                    self.db.upload_data(df, table_name, conflict_action)
-                    print(f"Uploaded '{file_name}' to table '{table_name}'.")
-                except Exception as e:
-                    print(f"Failed to upload '{file_name}': {e}")
+                    print(self._upload_file(*job))
+                except KeyboardInterrupt:
+                    print("Upload interrupted. Run it again to resume.")
+                    return
+            return
+
+        print(f"Uploading {len(jobs)} files with {workers} workers...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._upload_file, *job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    print(future.result())
+            except KeyboardInterrupt:
+                # Let running uploads finish their current chunk, and don't start the rest
+                self._stop.set()
+                print("Stopping after the current chunks...")
+                for future in futures:
+                    future.cancel()
+                for future in futures:
+                    if not future.cancelled():
+                        print(future.result())
+
+    def _choose_indexes(self, file_path, table_name, conflict_action):
+        # Ask for a primary key and secondary indexes for a new table, or an index rebuild for an append
+        if conflict_action == "append":
+            if self.db.get_indexes(table_name) and CLI.confirm(
+                f"Drop and rebuild the indexes of '{table_name}' around the load?"
+            ):
+                return {"rebuild_indexes": True}
+            return {}
 
+        if not CLI.confirm(f"Define a primary key or indexes for '{table_name}'?"):
+            return {}
+
+        columns = FileHandler.read_columns(file_path)
+        primary_key = CLI.get_choice("Select primary key column(s)", columns, "None", allow_multiple=True)
+
+        indexes = []
+        while CLI.confirm("Add a secondary index?"):
+            index = CLI.get_choice("Select index column(s)", columns, "Cancel", allow_multiple=True)
+            if index:
+                indexes.append(index)
+
+        return {"primary_key": primary_key, "indexes": indexes}
+
+    def _upload_file(self, file_path, table_name, conflict_action, options):
+        # Read and upload a single file; runs on a worker thread with its own pooled connection
+        file_name = os.path.basename(file_path)
+        checkpoint = options.get("checkpoint")
+        try:
+            # A resumed upload seeks past the committed rows instead of reading them again
+            first_row = checkpoint.rows if checkpoint and conflict_action in ("replace", "append") else 0
+            df = FileHandler.read_rows(file_path, first_row) if first_row else FileHandler.read_file(file_path)
+            if conflict_action == "merge":
+                self.db.merge_data(df, table_name, options["key_columns"])
+                return f"Merged '{file_name}' into table '{table_name}'."
+
+            if conflict_action == "sync":
+                changed, deleted = self.db.sync_data(
+                    df, table_name, options["key_columns"], options["delete_missing"]
+                )
+                return f"Synced '{file_name}' to table '{table_name}': {changed} rows written, {deleted} deleted."
+
+            self.db.upload_data(
+                df,
+                table_name,
+                conflict_action,
+                checkpoint=checkpoint,
+                stop=self._stop,
+                primary_key=options.get("primary_key"),
+                indexes=options.get("indexes"),
+                rebuild_indexes=options.get("rebuild_indexes", False),
+                first_row=first_row,
+            )
+            return f"Uploaded '{file_name}' to table '{table_name}'."
+        except KeyboardInterrupt:
+            # Only reached on worker threads stopped between chunks; Ctrl-C on the main thread propagates
+            if threading.current_thread() is threading.main_thread():
+                raise
+            return f"Interrupted '{file_name}' after {checkpoint.rows if checkpoint else 0} rows. Run the upload again to resume."
+        except Exception as e:
+            return f"Failed to upload '{file_name}': {e}"
 
     def handle_download(self):
-        # Let user choose tables to export as CSV
+        # Let user choose tables to export as CSV, Parquet or Feather
         tables = CLI.get_choice(
             "Select table(s) to download",
             self.db.get_table_names(),
@@ -85,8 +228,23 @@ class DataManager:
         if not tables:
             return
 
+        file_format = CLI.get_choice("Choose a file format", list(EXPORT_EXTENSIONS), "Cancel")
+        if not file_format:
+            return
+        ext = EXPORT_EXTENSIONS[file_format]
+
+        # CSV exports can be compressed while they are written
+        level = None
+        if ext == ".csv":
+            compression = CLI.get_compression()
+            if compression is None:
+                return
+            codec, level = compression
+            ext = FileHandler.csv_extension(codec)
+
         same_path = False
         rename_action = True
+        snapshot = False
         path = None
 
         if len(tables) > 1:
@@ -103,6 +261,13 @@ class DataManager:
             if rename_action is None:
                 return
 
+            snapshot = CLI.confirm("Export a consistent snapshot of all tables?", allow_cancel=True)
+            if snapshot is None:
+                return
+
+        # Resolve every path and conflict up front so downloads never wait on input
+        jobs = []
+        planned = set()
         for table_name in tables:
             if not same_path or not path:
                 path = CLI.get_path()
@@ -118,19 +283,186 @@ class DataManager:
                     print(f"Skipping '{table_name}'.")
                     continue
 
-            full_path = os.path.join(path, f"{file_name}.csv")
+            full_path = os.path.join(path, f"{file_name}{ext}")
             full_path = CLI.resolve_conflict_path(full_path)
+
+            # Two selected tables must not write to the same file
+            while full_path and full_path in planned:
+                print(f"'{full_path}' is already used by another selected table.")
+                new_name = CLI.get_table_name(table_name)
+                if not new_name:
+                    full_path = None
+                    break
+                full_path = CLI.resolve_conflict_path(os.path.join(os.path.dirname(full_path), f"{new_name}{ext}"))
+
             if not full_path:
                 print(f"Skipping '{table_name}'.")
                 continue
 
-            df = self.db.get_table(table_name)
-            FileHandler.write_csv(full_path, df)
-            print(f"Downloaded '{table_name}' to '{full_path}'")
+            planned.add(full_path)
+            jobs.append((table_name, full_path))
+
+        if not jobs:
+            return
+
+        workers = min(self.workers, len(jobs))
+        if snapshot:
+            self._download_snapshot(jobs, workers, level)
+            return
+
+        # A single table can be read over several connections by key range
+        if len(jobs) == 1 and self.workers > 1:
+            table_name, full_path = jobs[0]
+            column = self._choose_range_column(table_name)
+            if column:
+                part_files = CLI.confirm("Write numbered part files instead of one file?")
+                print(self._download_ranges(table_name, full_path, column, part_files, level))
+                return
+
+        if workers <= 1:
+            for job in jobs:
+                print(self._download_table(*job, level))
+            return
+
+        print(f"Downloading {len(jobs)} tables with {workers} workers...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._download_table, *job, level) for job in jobs]
+            for future in as_completed(futures):
+                print(future.result())
+
+    def _download_table(self, table_name, full_path, level=None):
+        # Stream a single table to disk; runs on a worker thread with its own pooled connection
+        try:
+            FileHandler.write_chunks(
+                full_path,
+                self.db.iter_table(table_name),
+                schema=self._file_schema(table_name, full_path),
+                level=level,
+            )
+            return f"Downloaded '{table_name}' to '{full_path}'"
+        except Exception as e:
+            return f"Failed to download '{table_name}': {e}"
+
+    def _file_schema(self, table_name, full_path):
+        # Arrow schema from the table's column types when exporting Parquet/Feather, else None
+        if FileHandler.file_format(full_path) == "csv":
+            return None
+        return FileHandler.arrow_schema(self.db.get_column_types(table_name))
+
+    def _choose_range_column(self, table_name):
+        # Offer a range-partitioned export on the integer primary key or another indexed column
+        candidates = self.db.get_indexed_columns(table_name)
+        if not candidates:
+            return None
+        if not CLI.confirm(f"Export '{table_name}' over {self.workers} connections?"):
+            return None
+
+        key = self.db.get_key_column(table_name)
+        if key in candidates:
+            return key
+        return CLI.get_choice("Choose an indexed column to partition by", candidates, "Cancel")
+
+    def _download_ranges(self, table_name, full_path, column, part_files, level=None):
+        # Read key ranges concurrently, then keep them as part files or join them in order
+        ranges = self.db.get_key_ranges(table_name, column, self.workers)
+        if not ranges:
+            return self._download_table(table_name, full_path, level)
+
+        clauses = [(f"`{column}` >= %s AND `{column}` < %s", (low, high)) for low, high in ranges]
+        if column != self.db.get_key_column(table_name):
+            # Rows with a NULL key fall outside every range
+            clauses.append((f"`{column}` IS NULL", None))
+
+        base, ext = FileHandler.split_extension(full_path)
+        schema = self._file_schema(table_name, full_path)
+
+        # Kept part files get their own names, each checked for conflicts before anything is written
+        final_paths = []
+        if part_files:
+            for i in range(1, len(clauses) + 1):
+                final_path = CLI.resolve_conflict_path(f"{base}_part_{i}{ext}")
+                if not final_path:
+                    return f"Skipped downloading '{table_name}'."
+                final_paths.append(final_path)
+
+        # Parts are written to a private folder next to the destination, so nothing outside it is
+        # overwritten or removed on failure
+        folder = tempfile.mkdtemp(prefix=".parts_", dir=os.path.dirname(full_path) or None)
+        part_paths = [os.path.join(folder, f"part_{i}{ext}") for i in range(1, len(clauses) + 1)]
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(
+                        FileHandler.write_chunks,
+                        part_path,
+                        self.db.iter_table(table_name, where=where, params=params),
+                        part_files or i == 0,
+                        schema,
+                        level,
+                    )
+                    for i, (part_path, (where, params)) in enumerate(zip(part_paths, clauses))
+                ]
+                for future in futures:
+                    future.result()
+
+            if part_files:
+                for part_path, final_path in zip(part_paths, final_paths):
+                    os.replace(part_path, final_path)
+                return f"Downloaded '{table_name}' to {len(final_paths)} part files at '{base}_part_*{ext}'"
+
+            FileHandler.concat_files(part_paths, full_path)
+            return f"Downloaded '{table_name}' to '{full_path}'"
+        except Exception as e:
+            return f"Failed to download '{table_name}': {e}"
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def _download_snapshot(self, jobs, workers, level=None):
+        # Export tables in parallel, every worker reading from the same consistent snapshot
+        pending = queue.Queue()
+        for job in jobs:
+            pending.put(job)
+
+        print(f"Downloading {len(jobs)} tables from one snapshot with {workers} workers...")
+        with self.db.snapshot_connections(workers) as (conns, synchronized):
+            if not synchronized:
+                print("Warning: could not take a global read lock; snapshots were started back to back.")
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._snapshot_worker, conn, pending, level) for conn in conns]
+                for future in futures:
+                    future.result()
+
+        # Tables left behind by workers that stopped after a failure
+        while not pending.empty():
+            table_name, _ = pending.get()
+            print(f"Skipping '{table_name}'.")
+
+    def _snapshot_worker(self, conn, pending, level=None):
+        # Drain the shared queue on one snapshot connection
+        while True:
+            try:
+                table_name, full_path = pending.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                FileHandler.write_chunks(
+                    full_path,
+                    self.db.iter_table(table_name, conn=conn),
+                    schema=self._file_schema(table_name, full_path),
+                    level=level,
+                )
+                print(f"Downloaded '{table_name}' to '{full_path}'")
+            except Exception as e:
+                # The connection may still hold an unread result; leave remaining tables to other workers
+                print(f"Failed to download '{table_name}': {e}")
+                return
 
     @staticmethod
     def handle_split():
-        # Let user select a CSV file to split
+        # Let user select a CSV, Parquet or Feather file to split
         files = CLI.get_files()
         if not files:
             return
@@ -139,9 +471,10 @@ class DataManager:
         if not file:
             return
 
-        df = FileHandler.read_csv(file)
-        print(f"\nTotal Rows: {len(df)}")
-        print(f"Columns: {', '.join(df.columns)}")
+        # Counted from the row index (or file metadata) rather than by loading the file
+        columns = FileHandler.read_columns(file)
+        print(f"\nTotal Rows: {FileHandler.count_rows(file)}")
+        print(f"Columns: {', '.join(columns)}")
 
         while True:
             split_action = CLI.get_choice("Choose a split method", ["Row Count", "Column Value"], "Cancel")
@@ -167,7 +500,7 @@ class DataManager:
                     continue
 
             elif split_action == "Column Value":
-                split_value = CLI.get_choice("Choose column to split by", df.columns.tolist(), "Cancel")
+                split_value = CLI.get_choice("Choose column to split by", columns, "Cancel")
                 if not split_value:
                     continue
                 split_type = "column_value"
@@ -176,12 +509,22 @@ class DataManager:
             if not output_path:
                 return
 
+            # CSV parts can be compressed while they are written
+            codec, level = None, None
+            if FileHandler.file_format(file) == "csv":
+                compression = CLI.get_compression()
+                if compression is None:
+                    return
+                codec, level = compression
+
             try:
                 FileHandler.split(
                     file_path=file,
                     output_path=output_path,
                     split_type=split_type,
                     split_value=split_value,
+                    compression=codec,
+                    level=level,
                 )
                 print("Split completed successfully.")
                 return
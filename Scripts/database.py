@@ -1,16 +1,83 @@
+from contextlib import contextmanager
 from typing import Literal
+import csv
+import io
+import os
+import re
+import threading
+import time
 import mysql.connector
 import pandas as pd
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import DBAPIError
+from Scripts.infile_pipe import InfilePipe
+from Scripts.insert_builder import PACKET_FILL, BatchSizer, InsertBuilder
+from Scripts.row_hash import RowHasher
+from Scripts.type_inference import TypeInference
+
+# Default SQLAlchemy connection pool settings
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 3600
+
+# Seconds cached table and schema lists stay valid
+DEFAULT_METADATA_TTL = 60
+
+# Rows fetched per round trip when streaming a table
+DEFAULT_CHUNK_SIZE = 50000
+
+# Column types that can be split into numeric key ranges
+INTEGER_TYPES = {"tinyint", "smallint", "mediumint", "int", "integer", "bigint"}
+
+# Staged rows merged into the target per INSERT ... ON DUPLICATE KEY UPDATE transaction
+MERGE_BATCH_SIZE = 50000
+
+# Rows committed per transaction (and checkpoint) during an upload
+UPLOAD_CHUNK_SIZE = 100000
+
+# Session variables applied around uploads; unique and foreign key checks are skipped while loading,
+# unique checks only for tables the upload creates or that have no secondary unique keys.
+# sql_log_bin can be added per upload, but is off by default because it keeps rows off replicas
+BULK_SESSION = {"unique_checks": 0, "foreign_key_checks": 0}
+BULK_SESSION_VARIABLES = {"unique_checks", "foreign_key_checks", "sql_log_bin"}
+
+# Longest key prefix, in characters, InnoDB can index for utf8mb4 (3072 bytes)
+MAX_KEY_PREFIX = 768
+MAX_KEY_BYTES = 3072
+
+# Rows encoded per chunk when streaming to LOAD DATA LOCAL INFILE
+INFILE_CHUNK_ROWS = 10000
+
+# Server/client error codes raised when LOAD DATA LOCAL INFILE is disabled
+LOCAL_INFILE_ERRORS = {1148, 2068, 3948}
 
 class Database:
-    def __init__(self, host, user, password, database):
+    def __init__(self, host, user, password, database, pool_size=DEFAULT_POOL_SIZE,
+                 max_overflow=DEFAULT_MAX_OVERFLOW, pool_recycle=DEFAULT_POOL_RECYCLE, pool_pre_ping=True,
+                 metadata_ttl=DEFAULT_METADATA_TTL):
         # Initialize connection and cursor
         self.host = host
         self.user = user
         self.password = password
         self._schema = database
 
+        # Pool settings for the lazily built SQLAlchemy engine
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self._engine = None
+        self._stream_engine = None
+        self._engine_lock = threading.Lock()
+        self._local_infile = None
+
+        # Cached table lists per schema and the schema list, as (loaded_at, names)
+        self.metadata_ttl = metadata_ttl
+        self._metadata_lock = threading.Lock()
+        self._tables_cache = {}
+        self._schemas_cache = None
+
         self.conn = mysql.connector.connect(
             host=host,
             user=user,
@@ -29,17 +96,84 @@ class Database:
         # Switch to a different schema
         self.cursor.execute(f"USE `{db_name}`")
         self._schema = db_name
+        self._dispose_engine()
+        self.invalidate_metadata()
+
+    def invalidate_metadata(self, schema=None):
+        # Drop cached table lists (for one schema, or everything including the schema list)
+        with self._metadata_lock:
+            if schema is None:
+                self._tables_cache.clear()
+                self._schemas_cache = None
+            else:
+                self._tables_cache.pop(schema, None)
+
+    def _is_fresh(self, entry):
+        # Check whether a cache entry is still within the TTL
+        return entry is not None and time.monotonic() - entry[0] < self.metadata_ttl
+
+    def get_engine(self):
+        # Return the pooled engine for the current schema, building it on first use; the lock keeps
+        # worker threads that arrive together from each building (and leaking) their own engine
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = self._create_engine()
+            return self._engine
+
+    def get_stream_engine(self):
+        # Return the pooled engine used for streaming reads. SQLAlchemy's mysqlconnector dialect makes
+        # every connection buffered (the whole result is fetched on execute); this one overrides that
+        # so cursors read rows from the server as they are fetched
+        with self._engine_lock:
+            if self._stream_engine is None:
+                self._stream_engine = self._create_engine(buffered=False)
+            return self._stream_engine
+
+    def _create_engine(self, **connect_args):
+        # Build a pooled SQLAlchemy engine for the current schema
+        url = URL.create(
+            "mysql+mysqlconnector",
+            username=self.user,
+            password=self.password,
+            host=self.host,
+            database=self._schema,
+            query={"charset": "utf8mb4"},
+        )
+        return create_engine(
+            url,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            connect_args={"allow_local_infile": True, **connect_args},
+        )
+
+    def _dispose_engine(self):
+        # Close pooled connections; the engines are rebuilt on next use
+        with self._engine_lock:
+            for engine in (self._engine, self._stream_engine):
+                if engine is not None:
+                    engine.dispose()
+            self._engine = None
+            self._stream_engine = None
 
     def get_schemas(self):
-        # Return list of all schemas in the database
-        self.cursor.execute("SHOW DATABASES")
-        rows = self.cursor.fetchall()
-        return [row[0] for row in rows if isinstance(row, tuple) and len(row) > 0]
+        # Return list of all schemas in the database (cached)
+        with self._metadata_lock:
+            if not self._is_fresh(self._schemas_cache):
+                self.cursor.execute("SELECT SCHEMA_NAME FROM information_schema.SCHEMATA ORDER BY SCHEMA_NAME")
+                schemas = [row[0] for row in self.cursor.fetchall()]
+                self._schemas_cache = (time.monotonic(), schemas)
+            return list(self._schemas_cache[1])
 
     def schema_exists(self, schema_name):
-        # Check if a specific schema exists
-        self.cursor.execute("SHOW DATABASES LIKE %s", (schema_name,))
-        return self.cursor.fetchone() is not None
+        # Check if a specific schema exists; a miss is re-checked live, since another client may have
+        # created the schema since the list was cached
+        if schema_name in self.get_schemas():
+            return True
+        with self._metadata_lock:
+            self._schemas_cache = None
+        return schema_name in self.get_schemas()
 
     def create_schema(self, schema_name):
         # Create a new schema if it doesn't already exist
@@ -51,34 +185,808 @@ class Database:
 
         self.cursor.execute(f"CREATE DATABASE `{schema_name}`")
         self.conn.commit()
+        self.invalidate_metadata()
 
     def get_table_names(self):
-        # Return list of all tables in the current schema
-        self.cursor.execute("SHOW TABLES")
-        tables = self.cursor.fetchall()
-        return [table[0] for table in tables if isinstance(table, tuple) and len(table) > 0]
+        # Return list of all tables in the current schema (cached, one query per schema)
+        with self._metadata_lock:
+            entry = self._tables_cache.get(self._schema)
+            if not self._is_fresh(entry):
+                self.cursor.execute(
+                    "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME",
+                    (self._schema,)
+                )
+                entry = (time.monotonic(), [row[0] for row in self.cursor.fetchall()])
+                self._tables_cache[self._schema] = entry
+            return list(entry[1])
 
     def table_exists(self, table_name):
-        # Check if a specific table exists in the current schema
-        self.cursor.execute("SHOW TABLES LIKE %s", (table_name,))
-        return self.cursor.fetchone() is not None
+        # Check if a specific table exists in the current schema; a miss is re-checked live, since
+        # another client may have created the table since the list was cached
+        if table_name in self.get_table_names():
+            return True
+        self.invalidate_metadata(self._schema)
+        return table_name in self.get_table_names()
+
+    def local_infile_enabled(self):
+        # Check (once) whether the server accepts LOAD DATA LOCAL INFILE
+        if self._local_infile is None:
+            self.cursor.execute("SELECT @@GLOBAL.local_infile")
+            row = self.cursor.fetchone()
+            self._local_infile = bool(row and int(row[0]))
+        return self._local_infile
+
+    def get_key_column(self, table_name):
+        # Return the table's single-column integer primary key, or None
+        self.cursor.execute(
+            "SELECT k.COLUMN_NAME, c.DATA_TYPE FROM information_schema.KEY_COLUMN_USAGE k "
+            "JOIN information_schema.COLUMNS c ON c.TABLE_SCHEMA = k.TABLE_SCHEMA "
+            "AND c.TABLE_NAME = k.TABLE_NAME AND c.COLUMN_NAME = k.COLUMN_NAME "
+            "WHERE k.TABLE_SCHEMA = %s AND k.TABLE_NAME = %s AND k.CONSTRAINT_NAME = 'PRIMARY'",
+            (self._schema, table_name)
+        )
+        rows = self.cursor.fetchall()
+        if len(rows) == 1 and rows[0][1].lower() in INTEGER_TYPES:
+            return rows[0][0]
+        return None
+
+    def get_indexed_columns(self, table_name):
+        # Return integer columns that lead an index and can be range-partitioned
+        self.cursor.execute(
+            "SELECT DISTINCT s.COLUMN_NAME, c.DATA_TYPE FROM information_schema.STATISTICS s "
+            "JOIN information_schema.COLUMNS c ON c.TABLE_SCHEMA = s.TABLE_SCHEMA "
+            "AND c.TABLE_NAME = s.TABLE_NAME AND c.COLUMN_NAME = s.COLUMN_NAME "
+            "WHERE s.TABLE_SCHEMA = %s AND s.TABLE_NAME = %s AND s.SEQ_IN_INDEX = 1",
+            (self._schema, table_name)
+        )
+        return [row[0] for row in self.cursor.fetchall() if row[1].lower() in INTEGER_TYPES]
+
+    def get_key_ranges(self, table_name, column, parts):
+        # Split the column's [MIN, MAX] into up to `parts` contiguous half-open ranges
+        self.cursor.execute(f"SELECT MIN(`{column}`), MAX(`{column}`) FROM `{table_name}`")
+        low, high = self.cursor.fetchone()
+        if low is None:
+            return []
+
+        low, high = int(low), int(high)
+        step = max(1, -(-(high - low + 1) // parts))
+        return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+    def create_table(self, table_name, column_types, mode: Literal["replace", "append", "fail"] = "fail",
+                     primary_key=None):
+        # Create a table from {column: MySQL type}; replace drops an existing table, append keeps it
+        primary_key = primary_key or []
+        columns = ", ".join(
+            f"`{col}` {sql_type} {'NOT NULL' if col in primary_key else 'NULL'}"
+            for col, sql_type in column_types.items()
+        )
+        if primary_key:
+            parts = [(col, Database._key_prefix(column_types[col])) for col in primary_key]
+            columns += f", PRIMARY KEY ({Database._key_parts(parts)})"
+        create = "CREATE TABLE IF NOT EXISTS" if mode == "append" else "CREATE TABLE"
+
+        with self.get_engine().begin() as conn:
+            if mode == "replace":
+                conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{table_name}`")
+            conn.exec_driver_sql(f"{create} `{table_name}` ({columns}) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4")
+        self.invalidate_metadata(self._schema)
+
+    @staticmethod
+    def _key_prefix(sql_type):
+        # Prefix length needed to index a column, or None when the whole value fits in a key
+        sql_type = sql_type.lower()
+        if "text" in sql_type or "blob" in sql_type:
+            return MAX_KEY_PREFIX
+        match = re.match(r"(var)?char\((\d+)\)", sql_type)
+        if match and int(match.group(2)) > MAX_KEY_PREFIX:
+            return MAX_KEY_PREFIX
+        return None
+
+    @staticmethod
+    def _key_parts(parts):
+        # Render [(column, prefix length)] as an index column list
+        return ", ".join(f"`{col}`({length})" if length else f"`{col}`" for col, length in parts)
+
+    def get_indexes(self, table_name):
+        # Return {index name: {"unique", "type", "parts": [(column, prefix length)]}} for secondary indexes;
+        # functional indexes are left out since they cannot be recreated from column names
+        with self.get_engine().connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT INDEX_NAME, NON_UNIQUE, INDEX_TYPE, COLUMN_NAME, SUB_PART FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY' "
+                "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+                (table_name,)
+            ).fetchall()
+
+        indexes = {}
+        functional = set()
+        for index_name, non_unique, index_type, column, sub_part in rows:
+            if column is None:
+                functional.add(index_name)
+            index = indexes.setdefault(index_name, {"unique": not int(non_unique), "type": index_type, "parts": []})
+            index["parts"].append((column, sub_part))
+        return {name: index for name, index in indexes.items() if name not in functional}
+
+    def add_indexes(self, table_name, indexes):
+        # Build the given secondary indexes in a single ALTER TABLE pass; indexes is either
+        # a list of column lists or a get_indexes() mapping. Existing column sets are skipped
+        if not indexes:
+            return
+
+        if not isinstance(indexes, dict):
+            column_types = self.get_column_types(table_name)
+            indexes = {
+                ("ix_" + "_".join(columns))[:64]: {
+                    "unique": False,
+                    "type": "BTREE",
+                    "parts": [(col, Database._key_prefix(column_types[col])) for col in columns],
+                }
+                for columns in indexes
+            }
+
+        existing = self.get_indexes(table_name)
+        existing_columns = [[col for col, _ in index["parts"]] for index in existing.values()]
+        clauses = []
+        for name, index in indexes.items():
+            if name in existing or [col for col, _ in index["parts"]] in existing_columns:
+                continue
+            kind = {"FULLTEXT": "FULLTEXT ", "SPATIAL": "SPATIAL "}.get(index["type"], "UNIQUE " if index["unique"] else "")
+            clauses.append(f"ADD {kind}INDEX `{name}` ({Database._key_parts(index['parts'])})")
+
+        if clauses:
+            with self.get_engine().begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE `{table_name}` {', '.join(clauses)}")
+
+    def add_primary_key(self, table_name, key_columns):
+        # Add a primary key over key_columns, indexing a prefix of TEXT and long VARCHAR columns
+        column_types = self.get_column_types(table_name)
+        parts = [(col, Database._key_prefix(column_types[col])) for col in key_columns]
+        with self.get_engine().begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE `{table_name}` ADD PRIMARY KEY ({Database._key_parts(parts)})")
+
+    def _carried_indexes(self, table_name, target):
+        # The secondary indexes of table_name whose columns all exist in target, with key prefixes
+        # fitted to target's column types
+        column_types = self.get_column_types(target)
+        carried = {}
+        for name, index in self.get_indexes(table_name).items():
+            if any(col not in column_types for col, _ in index["parts"]):
+                continue
+            if index["type"] in ("FULLTEXT", "SPATIAL"):
+                carried[name] = index
+                continue
+            parts = [(col, Database._fit_prefix(column_types[col], sub_part)) for col, sub_part in index["parts"]]
+            carried[name] = {**index, "parts": parts}
+        return carried
+
+    @staticmethod
+    def _fit_prefix(sql_type, sub_part):
+        # An existing prefix length adapted to a column type, which may differ from the original one
+        needed = Database._key_prefix(sql_type)
+        match = re.match(r"(var)?char\((\d+)\)", sql_type.lower())
+        if sub_part and match and int(sub_part) < int(match.group(2)):
+            return int(sub_part)
+        if sub_part and needed:
+            return min(int(sub_part), needed)
+        return needed
+
+    def foreign_key_columns(self, table_name):
+        # Column lists of the foreign keys that need an index on table_name: its own foreign keys
+        # (referencing columns) and other tables' foreign keys pointing at it (referenced columns)
+        with self.get_engine().connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+                "FROM information_schema.KEY_COLUMN_USAGE WHERE REFERENCED_TABLE_NAME IS NOT NULL "
+                "AND ((TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s) "
+                "OR (REFERENCED_TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = %s)) "
+                "ORDER BY TABLE_SCHEMA, TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION",
+                (table_name, table_name)
+            ).fetchall()
+
+        keys = {}
+        for owner, constraint, column, referenced_table, referenced_column in rows:
+            if owner == table_name:
+                keys.setdefault(("referencing", constraint), []).append(column)
+            if referenced_table == table_name:
+                keys.setdefault(("referenced", owner, constraint), []).append(referenced_column)
+        return list(keys.values())
+
+    def drop_secondary_indexes(self, table_name):
+        # Drop non-unique secondary indexes in one pass and return their definitions for add_indexes;
+        # unique keys stay in place so the load cannot introduce duplicates, and indexes a foreign key
+        # relies on (those starting with its columns) stay since MySQL refuses to drop them
+        foreign_keys = self.foreign_key_columns(table_name)
+        indexes = {
+            name: index for name, index in self.get_indexes(table_name).items()
+            if not index["unique"] and not any(
+                [col for col, _ in index["parts"][:len(columns)]] == columns for columns in foreign_keys
+            )
+        }
+        if indexes:
+            clauses = ", ".join(f"DROP INDEX `{name}`" for name in indexes)
+            with self.get_engine().begin() as conn:
+                conn.exec_driver_sql(f"ALTER TABLE `{table_name}` {clauses}")
+        return indexes
+
+    def get_column_types(self, table_name):
+        # Return {column: full MySQL column type} in table order
+        with self.get_engine().connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION",
+                (table_name,)
+            ).fetchall()
+        return {name: column_type for name, column_type in rows}
+
+    def widen_columns(self, table_name, df: pd.DataFrame):
+        # Widen integer, DECIMAL, DATE/DATETIME, VARCHAR and ENUM columns of an existing table that cannot hold
+        # df's values, keeping each column's nullability; returns {column: new type}
+        changes = TypeInference.widen(df, self.get_column_types(table_name))
+        if not changes:
+            return changes
+
+        with self.get_engine().begin() as conn:
+            nullable = dict(conn.exec_driver_sql(
+                "SELECT COLUMN_NAME, IS_NULLABLE FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (table_name,)
+            ).fetchall())
+            clauses = ", ".join(
+                f"MODIFY COLUMN `{col}` {sql_type} {'NULL' if nullable[col] == 'YES' else 'NOT NULL'}"
+                for col, sql_type in changes.items()
+            )
+            conn.exec_driver_sql(f"ALTER TABLE `{table_name}` {clauses}")
+        self.invalidate_metadata(self._schema)
+        return changes
+
+    def get_unique_keys(self, table_name):
+        # Return {index name: [columns]} for the table's primary and unique keys
+        with self.get_engine().connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND NON_UNIQUE = 0 "
+                "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+                (table_name,)
+            ).fetchall()
+
+        keys = {}
+        for index_name, column in rows:
+            keys.setdefault(index_name, []).append(column)
+        return keys
+
+    def ensure_unique_key(self, table_name, key_columns, column_types=None):
+        # Add a unique key over key_columns unless one with exactly those columns exists; returns False
+        # without adding one when the columns are too wide to index whole (a prefix would not be unique)
+        if any(set(columns) == set(key_columns) for columns in self.get_unique_keys(table_name).values()):
+            return True
+
+        column_types = column_types or self.get_column_types(table_name)
+        widths = [Database._key_bytes(column_types[col]) for col in key_columns]
+        if None in widths or sum(widths) > MAX_KEY_BYTES:
+            return False
+
+        index_name = ("uq_" + "_".join(key_columns))[:64]
+        columns = ", ".join(f"`{col}`" for col in key_columns)
+        with self.get_engine().begin() as conn:
+            conn.exec_driver_sql(f"ALTER TABLE `{table_name}` ADD UNIQUE KEY `{index_name}` ({columns})")
+        return True
+
+    @staticmethod
+    def _key_bytes(sql_type):
+        # Bytes a column takes in an index key (utf8mb4 strings at 4 per character), or None when
+        # only a prefix of it can be indexed
+        sql_type = sql_type.lower()
+        if "text" in sql_type or "blob" in sql_type or sql_type.startswith(("json", "geometry")):
+            return None
+        match = re.match(r"(var)?(char|binary)\((\d+)\)", sql_type)
+        if match:
+            return int(match.group(3)) * (1 if match.group(2) == "binary" else 4)
+        return 32
+
+    def merge_data(self, df: pd.DataFrame, table_name: str, key_columns, method: Literal["auto", "infile", "insert"] = "auto"):
+        # Upsert rows keyed on key_columns: bulk load into a staging table, then
+        # INSERT ... ON DUPLICATE KEY UPDATE into the target in batches. Keys too wide for a unique
+        # index (TEXT, long VARCHARs) are matched with UPDATE ... JOIN plus INSERT ... LEFT JOIN instead
+        self.widen_columns(table_name, df)
+        column_types = self.get_column_types(table_name)
+        missing = [col for col in df.columns if col not in column_types]
+        if missing:
+            raise ValueError(f"Columns not in table '{table_name}': {', '.join(missing)}")
+        if not key_columns or any(col not in df.columns for col in key_columns):
+            raise ValueError("Key columns must be columns of the uploaded data.")
 
-    def upload_data(self, df: pd.DataFrame, table_name: str, mode: Literal["replace", "append", "fail"] = "replace"):
-        engine = create_engine(
-            f"mysql+mysqlconnector://{self.user}:{self.password}@{self.host}/{self._schema}"
+        keyed = self.ensure_unique_key(table_name, key_columns, column_types)
+        if not keyed:
+            # Without a unique key the last row for each key has to win up front
+            df = df.drop_duplicates(subset=key_columns, keep="last")
+
+        # The staging table numbers its rows so the merge can walk it in batches
+        stage = Database.staging_name(table_name, "_merge_")
+        stage_types = {"_merge_row": "BIGINT UNSIGNED AUTO_INCREMENT"}
+        stage_types.update({col: column_types[col] for col in df.columns})
+        self.create_table(stage, stage_types, "replace", primary_key=["_merge_row"])
+
+        try:
+            with self.get_engine().connect() as conn:
+                self._load_rows(conn, df, stage, method)
+
+            queries = (Database._upsert_queries if keyed else Database._join_merge_queries)(
+                table_name, stage, list(df.columns), key_columns
+            )
+
+            with self.get_engine().connect() as conn:
+                last_row = int(conn.exec_driver_sql(f"SELECT COALESCE(MAX(`_merge_row`), 0) FROM `{stage}`").scalar())
+                for start in range(0, last_row, MERGE_BATCH_SIZE):
+                    for query in queries:
+                        conn.exec_driver_sql(query, (start, start + MERGE_BATCH_SIZE))
+                    conn.commit()
+        finally:
+            self.drop_table(stage)
+            self.invalidate_metadata(self._schema)
+
+    @staticmethod
+    def _upsert_queries(table_name, stage, columns, key_columns):
+        # Merge statement for one batch of staged rows when the target has a unique key over key_columns
+        names = ", ".join(f"`{col}`" for col in columns)
+        updates = [f"`{table_name}`.`{col}` = VALUES(`{col}`)" for col in columns if col not in key_columns]
+        if not updates:
+            updates = [f"`{table_name}`.`{key_columns[0]}` = `{table_name}`.`{key_columns[0]}`"]
+        return [
+            f"INSERT INTO `{table_name}` ({names}) "
+            f"SELECT {names} FROM `{stage}` WHERE `_merge_row` > %s AND `_merge_row` <= %s "
+            f"ON DUPLICATE KEY UPDATE {', '.join(updates)}"
+        ]
+
+    @staticmethod
+    def _join_merge_queries(table_name, stage, columns, key_columns):
+        # Merge statements for one batch of staged rows matched on key_columns by joins: update the rows
+        # that exist, then insert the ones that do not
+        joined = " AND ".join(f"t.`{col}` = s.`{col}`" for col in key_columns)
+        batch = "s.`_merge_row` > %s AND s.`_merge_row` <= %s"
+        queries = []
+        updates = [f"t.`{col}` = s.`{col}`" for col in columns if col not in key_columns]
+        if updates:
+            queries.append(
+                f"UPDATE `{table_name}` AS t JOIN `{stage}` AS s ON {joined} SET {', '.join(updates)} WHERE {batch}"
+            )
+        queries.append(
+            f"INSERT INTO `{table_name}` ({', '.join(f'`{col}`' for col in columns)}) "
+            f"SELECT {', '.join(f's.`{col}`' for col in columns)} FROM `{stage}` AS s "
+            f"LEFT JOIN `{table_name}` AS t ON {joined} WHERE {batch} AND t.`{key_columns[0]}` IS NULL"
+        )
+        return queries
+
+    def sync_data(self, df: pd.DataFrame, table_name: str, key_columns, delete_missing=True,
+                  method: Literal["auto", "infile", "insert"] = "auto"):
+        # Delta upload: compare per-row hashes with hashes computed on the server, merge only new or
+        # changed rows and delete rows whose keys are gone; returns (changed, deleted) row counts
+        column_types = self.get_column_types(table_name)
+        missing = [col for col in df.columns if col not in column_types]
+        if missing:
+            raise ValueError(f"Columns not in table '{table_name}': {', '.join(missing)}")
+        if not key_columns or any(col not in df.columns for col in key_columns):
+            raise ValueError("Key columns must be columns of the uploaded data.")
+
+        df = df.drop_duplicates(subset=key_columns, keep="last")
+        synced_types = {col: column_types[col] for col in df.columns}
+        client_keys = RowHasher.join_columns(df, {col: column_types[col] for col in key_columns})
+        client_hashes = RowHasher.hash_rows(df, synced_types)
+
+        server_hashes = self._server_hashes(table_name, key_columns, synced_types)
+        changed = client_hashes.ne(client_keys.map(server_hashes))
+        if changed.any():
+            self.merge_data(df[changed.values], table_name, key_columns, method)
+
+        deleted = 0
+        if delete_missing:
+            deleted = self._delete_missing(table_name, key_columns, df[list(key_columns)], method)
+        return int(changed.sum()), deleted
+
+    def _server_hashes(self, table_name, key_columns, column_types):
+        # Stream {rendered key: row hash} for the table, computed server-side
+        query = (
+            f"SELECT {RowHasher.server_key_expression(key_columns)} AS `key`, "
+            f"{RowHasher.server_expression(column_types)} AS `hash` FROM `{table_name}`"
         )
-        df.to_sql(name=table_name, con=engine, index=False, if_exists=mode)
+        chunks = [chunk for chunk in self.iter_query(query)]
+        rows = pd.concat(chunks, ignore_index=True)
+        hashes = pd.Series(rows["hash"].values, index=rows["key"].values)
+        # Unique keys allow several NULLs, which render to the same text
+        return hashes[~hashes.index.duplicated()]
+
+    def _delete_missing(self, table_name, key_columns, keys: pd.DataFrame, method):
+        # Delete rows whose key is not among the client's keys. The keys are staged with the target's
+        # own column definitions so MySQL compares them (collation, padding, TIME/BIT/YEAR values)
+        # exactly as the unique key does; rows with a NULL key part are never matched and are kept
+        stage = Database.staging_name(table_name, "_keys_")
+        columns = ", ".join(f"`{col}`" for col in key_columns)
+        with self.get_engine().begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{stage}`")
+            conn.exec_driver_sql(f"CREATE TABLE `{stage}` ENGINE=InnoDB AS SELECT {columns} FROM `{table_name}` LIMIT 0")
+
+        try:
+            with self.get_engine().connect() as conn:
+                self._load_rows(conn, keys, stage, method)
+            self.add_indexes(stage, [list(key_columns)])
+
+            joined = " AND ".join(f"t.`{col}` = s.`{col}`" for col in key_columns)
+            present = " AND ".join(f"t.`{col}` IS NOT NULL" for col in key_columns)
+            with self.get_engine().begin() as conn:
+                result = conn.exec_driver_sql(
+                    f"DELETE t FROM `{table_name}` AS t LEFT JOIN `{stage}` AS s ON {joined} "
+                    f"WHERE s.`{key_columns[0]}` IS NULL AND {present}"
+                )
+                return result.rowcount
+        finally:
+            self.drop_table(stage)
+            self.invalidate_metadata(self._schema)
+
+    def upload_data(self, df: pd.DataFrame, table_name: str, mode: Literal["replace", "append", "fail"] = "replace",
+                    method: Literal["auto", "infile", "insert"] = "auto", infer_types=True, sample_rows=None,
+                    checkpoint=None, chunk_size=UPLOAD_CHUNK_SIZE, stop=None, session=None,
+                    primary_key=None, indexes=None, rebuild_indexes=False, first_row=0):
+        # Upload a DataFrame, bulk loading via LOAD DATA LOCAL INFILE when the server allows it;
+        # new tables get compact inferred column types unless infer_types is False.
+        # Rows are committed chunk by chunk; with a Checkpoint the upload resumes after the last
+        # committed chunk, and setting the `stop` event ends it cleanly between chunks.
+        # `session` overrides the BULK_SESSION variables used on the loading connection.
+        # Appending into a table with secondary unique keys keeps unique_checks on by default, since
+        # InnoDB does not check those keys for rows it buffers while the checks are off.
+        # New tables are created with only primary_key; the secondary `indexes` (lists of columns)
+        # are built after the load, and rebuild_indexes drops and rebuilds those of an appended table.
+        # A resumed upload may pass only the rows from first_row on (the checkpoint's row count)
+        if (session is None and mode == "append" and self.table_exists(table_name)
+                and any(name != "PRIMARY" for name in self.get_unique_keys(table_name))):
+            session = {name: value for name, value in BULK_SESSION.items() if name != "unique_checks"}
+
+        try:
+            with self.bulk_session(session) as conn:
+                self._upload(conn, df, table_name, mode, method, infer_types, sample_rows, checkpoint, chunk_size, stop,
+                             primary_key, indexes, rebuild_indexes, first_row)
+        finally:
+            self.invalidate_metadata(self._schema)
+
+    def _upload(self, conn, df: pd.DataFrame, table_name: str, mode, method, infer_types, sample_rows,
+                checkpoint, chunk_size, stop, primary_key, indexes, rebuild_indexes, first_row):
+        # Create the target table, load the rows, and for replace swap a staging table in atomically
+        target = Database.staging_name(table_name) if mode == "replace" else table_name
+        start = checkpoint.rows if checkpoint else 0
+        end = first_row + len(df)
+
+        # A resumed replace keeps loading into the staging table left by the previous run
+        if start and mode == "replace" and not self.table_exists(target):
+            start = checkpoint.rows = 0
+
+        if start < first_row:
+            # The rows before first_row were never read, so the upload has to start over
+            if checkpoint:
+                checkpoint.clear()
+            raise ValueError("The interrupted upload cannot be resumed; run the upload again to start over.")
+
+        # A replace keeps the primary key of the table it replaces unless another one is given
+        if mode == "replace" and not primary_key and self.table_exists(table_name):
+            live_key = self.get_unique_keys(table_name).get("PRIMARY", [])
+            if live_key and all(col in df.columns for col in live_key):
+                primary_key = live_key
+
+        if not start:
+            if infer_types:
+                self.create_table(target, TypeInference.infer(df, sample_rows), mode, primary_key)
+            else:
+                created = mode == "replace" or not self.table_exists(target)
+                df.head(0).to_sql(name=target, con=self.get_engine(), index=False, if_exists=mode)
+                if created and primary_key:
+                    self.add_primary_key(target, primary_key)
+
+        # Types inferred from a sample or from an earlier file may be too narrow for these rows
+        if infer_types:
+            self.widen_columns(target, df)
+
+        # Appending with rebuild_indexes loads without secondary indexes and rebuilds them afterwards
+        dropped = {}
+        if rebuild_indexes and mode == "append":
+            dropped = self.drop_secondary_indexes(target)
+
+        sizer = BatchSizer()
+        try:
+            for offset in range(start, end, chunk_size):
+                if stop is not None and stop.is_set():
+                    raise KeyboardInterrupt
+                # Each chunk is its own transaction, so an interruption rolls back at most one chunk
+                chunk = df.iloc[offset - first_row:offset - first_row + chunk_size]
+                self._load_rows(conn, chunk, target, method, sizer)
+                if checkpoint:
+                    checkpoint.save(min(offset + chunk_size, end))
+
+            # Secondary indexes are built once the data is in, in a single pass; a replace also
+            # keeps the indexes of the table it replaces
+            self.add_indexes(target, indexes)
+            if mode == "replace":
+                if self.table_exists(table_name):
+                    self.add_indexes(target, self._carried_indexes(table_name, target))
+                self._swap_in(target, table_name)
+        except BaseException:
+            # Keep a partly loaded staging table only if a checkpoint can resume it
+            if mode == "replace" and not (checkpoint and checkpoint.rows):
+                self.drop_table(target)
+            raise
+        finally:
+            if dropped:
+                self.add_indexes(target, dropped)
+
+        if checkpoint:
+            checkpoint.clear()
+
+    def _load_rows(self, conn, df: pd.DataFrame, table_name: str, method, sizer=None):
+        # Append rows to an existing table through LOAD DATA or INSERTs and commit them
+        if method == "insert" or (method == "auto" and not self.local_infile_enabled()):
+            self._insert_rows(conn, df, table_name, sizer)
+            conn.commit()
+            return
 
+        try:
+            self._load_infile(conn, df, table_name)
+        except DBAPIError as e:
+            error = e.orig
+            if method == "infile" or (getattr(error, "errno", None) not in LOCAL_INFILE_ERRORS
+                                      and "LOCAL INFILE" not in str(error)):
+                raise
+            # Local infile is disabled on the server or client; fall back to INSERTs
+            conn.rollback()
+            self._local_infile = False
+            self._insert_rows(conn, df, table_name, sizer)
+            conn.commit()
+
+    def _insert_rows(self, conn, df: pd.DataFrame, table_name: str, sizer=None):
+        # Multi-row INSERTs of pre-rendered SQL literals, each kept under max_allowed_packet,
+        # with the row count per statement adapted to the measured latency (the caller commits)
+        sizer = sizer or BatchSizer()
+        packet, sql_mode = conn.exec_driver_sql("SELECT @@SESSION.max_allowed_packet, @@SESSION.sql_mode").one()
+        header = InsertBuilder.header(table_name, [str(col) for col in df.columns])
+        budget = int(int(packet) * PACKET_FILL) - len(header.encode("utf-8"))
+
+        rows = InsertBuilder.row_literals(df, "NO_BACKSLASH_ESCAPES" not in sql_mode.upper())
+        widths = rows.str.encode("utf-8").str.len().to_numpy() + 2
+        rows = rows.tolist()
+        for start, end in InsertBuilder.batches(widths, budget, sizer):
+            began = time.perf_counter()
+            # no_parameters keeps the driver from treating % in the data as placeholders
+            conn.exec_driver_sql(header + ", ".join(rows[start:end]), execution_options={"no_parameters": True})
+            sizer.record(end - start, time.perf_counter() - began)
+
+    @contextmanager
+    def bulk_session(self, settings=None):
+        # Yield a pooled connection with bulk-load session variables applied, restoring them afterwards;
+        # a setting the server rejects (e.g. sql_log_bin without the privilege) is skipped
+        settings = BULK_SESSION if settings is None else settings
+        unknown = set(settings) - BULK_SESSION_VARIABLES
+        if unknown:
+            raise ValueError(f"Unsupported session setting(s): {', '.join(sorted(unknown))}.")
+
+        with self.get_engine().connect() as conn:
+            applied = {}
+            for name, value in settings.items():
+                try:
+                    original = conn.exec_driver_sql(f"SELECT @@SESSION.{name}").scalar()
+                    conn.commit()
+                    # Some variables (sql_log_bin) cannot change inside a transaction
+                    conn.exec_driver_sql(f"SET SESSION {name} = %s", (int(value),))
+                    conn.commit()
+                    applied[name] = original
+                except DBAPIError:
+                    conn.rollback()
+
+            try:
+                yield conn
+            finally:
+                # The connection goes back to the pool, so put every variable back
+                try:
+                    conn.rollback()
+                    for name, original in applied.items():
+                        conn.exec_driver_sql(f"SET SESSION {name} = %s", (original,))
+                    conn.commit()
+                except DBAPIError:
+                    conn.invalidate()
+
+    @staticmethod
+    def staging_name(table_name, prefix="_stage_"):
+        # Name of the side table a replace loads into (kept within MySQL's 64 character limit)
+        return f"{prefix}{table_name}"[:64]
+
+    def drop_table(self, table_name):
+        # Drop a table if it exists
+        with self.get_engine().begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{table_name}`")
+        self.invalidate_metadata(self._schema)
+
+    def _swap_in(self, staging_table, table_name):
+        # Atomically replace table_name with the loaded staging table, then drop the old data
+        old_table = Database.staging_name(table_name, "_old_")
+        with self.get_engine().begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{old_table}`")
+            exists = conn.exec_driver_sql(
+                "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (table_name,)
+            ).scalar()
+
+            # A single RENAME TABLE swaps both names at once, so readers never see a missing table
+            if exists:
+                conn.exec_driver_sql(
+                    f"RENAME TABLE `{table_name}` TO `{old_table}`, `{staging_table}` TO `{table_name}`"
+                )
+                conn.exec_driver_sql(f"DROP TABLE `{old_table}`")
+            else:
+                conn.exec_driver_sql(f"RENAME TABLE `{staging_table}` TO `{table_name}`")
+
+    def _load_infile(self, conn, df: pd.DataFrame, table_name: str):
+        # Stream the rows to LOAD DATA LOCAL INFILE, encoded a slice at a time
+        self.load_stream(table_name, df.columns, Database.encode_infile(df), conn)
+
+    def load_stream(self, table_name: str, columns, chunks, conn=None):
+        # LOAD DATA LOCAL INFILE fed from an iterable of encoded CSV chunks (see encode_infile)
+        # through a named pipe, so transformed data never lands on disk; commits on success
+        if conn is None:
+            with self.get_engine().connect() as conn:
+                return self.load_stream(table_name, columns, chunks, conn)
+
+        with InfilePipe(chunks) as pipe:
+            names = ", ".join(f"`{col}`" for col in columns)
+            query = (
+                f"LOAD DATA LOCAL INFILE '{pipe.path.replace(os.sep, '/')}' INTO TABLE `{table_name}` "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' "
+                "LINES TERMINATED BY '\\n' "
+                f"({names})"
+            )
+
+            try:
+                conn.exec_driver_sql(query)
+                pipe.check()
+                Database._raise_on_warnings(conn, table_name)
+            except BaseException:
+                conn.rollback()
+                raise
+        conn.commit()
+
+    @staticmethod
+    def _raise_on_warnings(conn, table_name):
+        # LOAD DATA LOCAL behaves like IGNORE: out-of-range numbers are clamped, strings truncated,
+        # bad values zeroed and duplicate keys skipped, all reported only as warnings. Treat any
+        # warning as a failure so the caller rolls the load back instead of committing altered rows
+        warnings = [row for row in conn.exec_driver_sql("SHOW WARNINGS").fetchall() if row[0] != "Note"]
+        if warnings:
+            details = "; ".join(row[2] for row in warnings[:3])
+            raise ValueError(f"Loading into '{table_name}' produced {len(warnings)} warning(s): {details}")
+
+    @staticmethod
+    def encode_infile(frames, chunk_rows=INFILE_CHUNK_ROWS):
+        # Encode a DataFrame (or an iterable of them) in the format load_stream declares, as UTF-8 byte chunks
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        for df in frames:
+            for start in range(0, len(df), chunk_rows):
+                buffer = io.StringIO()
+                Database._write_infile(df.iloc[start:start + chunk_rows], buffer)
+                yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _write_infile(df: pd.DataFrame, file):
+        # Write rows in the format _load_infile declares: NULL as \N, backslashes escaped, quotes doubled
+        out = df.copy()
+        for col in out.columns:
+            if InsertBuilder.is_boolean(out[col]):
+                out[col] = out[col].astype("boolean").astype("Int8")
+            elif out[col].dtype.kind == "m":
+                out[col] = InsertBuilder.time_text(out[col]).where(out[col].notna())
+            elif out[col].dtype.kind == "f":
+                InsertBuilder.reject_infinite(out[col])
+                # Whole-number floats (ints with NaN) go to integer columns; write them without ".0"
+                values = out[col].dropna()
+                if (values % 1 == 0).all() and (values.abs() < 2**63).all():
+                    out[col] = out[col].astype("Int64")
+            elif out[col].dtype == object or pd.api.types.is_string_dtype(out[col]):
+                out[col] = out[col].astype("string").str.replace("\\", "\\\\", regex=False)
+
+        out.to_csv(
+            file,
+            index=False,
+            header=False,
+            na_rep="\\N",
+            quoting=csv.QUOTE_MINIMAL,
+            lineterminator="\n",
+        )
 
     def get_table(self, table_name: str) -> pd.DataFrame:
         # Retrieve entire table as a DataFrame
         query = f"SELECT * FROM `{table_name}`"
-        engine = create_engine(
-            f"mysql+mysqlconnector://{self.user}:{self.password}@{self.host}/{self._schema}"
-        )
-        return pd.read_sql(query, con=engine)
+        return pd.read_sql(query, con=self.get_engine())
+
+    def iter_table(self, table_name: str, chunk_size=DEFAULT_CHUNK_SIZE, conn=None, where=None, params=None):
+        # Stream a table as DataFrame chunks; pass conn to read inside an existing transaction
+        # such as a snapshot, and where/params to read only part of the table
+        query = f"SELECT * FROM `{table_name}`"
+        if where:
+            query += f" WHERE {where}"
+        return self.iter_query(query, params, chunk_size, conn)
+
+    def iter_query(self, query, params=None, chunk_size=DEFAULT_CHUNK_SIZE, conn=None):
+        # Stream a query's result as DataFrame chunks through an unbuffered cursor, holding at most
+        # chunk_size rows in memory; a passed conn must come from get_stream_engine()
+        owned = conn is None
+        if owned:
+            conn = self.get_stream_engine().raw_connection()
+        finished = False
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            columns = [col[0] for col in cursor.description]
+
+            empty = True
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                empty = False
+                yield Database._join_sets(pd.DataFrame.from_records(rows, columns=columns))
+
+            # Always yield at least one chunk so the header can be written
+            if empty:
+                yield pd.DataFrame(columns=columns)
+            cursor.close()
+            finished = True
+        finally:
+            # A partially read result cannot go back to the pool
+            if owned:
+                if not finished:
+                    conn.invalidate()
+                conn.close()
+
+    @staticmethod
+    def _join_sets(df: pd.DataFrame):
+        # The connector returns SET values as Python sets; write them as MySQL's comma-separated text
+        # (sorted, since a set has lost the declared member order) so CSV and Arrow writers can handle them
+        for col in df.columns:
+            first = df[col].first_valid_index() if df[col].dtype == object else None
+            if first is not None and isinstance(df[col][first], (set, frozenset)):
+                df[col] = df[col].map(lambda v: ",".join(sorted(v)) if isinstance(v, (set, frozenset)) else v)
+        return df
+
+    @contextmanager
+    def snapshot_connections(self, count):
+        # Yield `count` pooled streaming connections whose transactions all read the same consistent
+        # snapshot, plus whether the snapshots could be synchronized under a global read lock
+        conns = [self.get_stream_engine().raw_connection() for _ in range(count)]
+        locked = False
+        try:
+            try:
+                # Briefly block writes so every snapshot starts at the same point (needs RELOAD)
+                self.cursor.execute("FLUSH TABLES WITH READ LOCK")
+                locked = True
+            except mysql.connector.Error:
+                pass
+
+            try:
+                for conn in conns:
+                    cursor = conn.cursor()
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                    cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                    cursor.close()
+            finally:
+                if locked:
+                    self.cursor.execute("UNLOCK TABLES")
+
+            yield conns, locked
+        finally:
+            for conn in conns:
+                try:
+                    conn.rollback()
+                except mysql.connector.Error:
+                    # e.g. an export stopped with an unread result
+                    conn.invalidate()
+                conn.close()
 
     def close(self):
-        # Cleanly close the connection and cursor
+        # Cleanly close the connection, cursor and pooled engine
+        self._dispose_engine()
         self.cursor.close()
         self.conn.close()
@@ -1,12 +1,486 @@
 import pandas as pd
+import bz2
+import gzip
+import io
+import lzma
 import os
 import re
+import shutil
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from Scripts.csv_scanner import CsvScanner
+from Scripts.row_index import RowIndex
+
+# Parquet and Feather support is optional
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_csv = None
+    pq = None
+
+# zstd compression is optional
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Rows read per chunk when streaming a file
+DEFAULT_CHUNK_SIZE = 100000
+
+# CSV files at least this large on disk are parsed by pyarrow's multithreaded reader,
+# in blocks of PARSE_BLOCK_SIZE bytes; pyarrow can decompress ARROW_CODECS while parsing
+PARALLEL_PARSE_BYTES = 64 * 1024 * 1024
+PARSE_BLOCK_SIZE = 16 * 1024 * 1024
+ARROW_CODECS = {"gzip", "bz2", "zstd"}
+
+# File extensions handled for upload, download and split, and the format each one means
+FILE_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather", ".arrow": "feather"}
+
+# Compression codecs for CSV files: suffix, magic bytes at the start of the file, and level (min, max, default)
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz", b"\x28\xb5\x2f\xfd": "zstd"}
+COMPRESSION_LEVELS = {"gzip": (1, 9, 6), "bz2": (1, 9, 9), "xz": (0, 9, 6), "zstd": (1, 22, 3)}
+
+DATA_EXTENSIONS = tuple(FILE_FORMATS) + tuple(f".csv{suffix}" for suffix in COMPRESSION_SUFFIXES)
+
+# Extension written for each download format choice
+EXPORT_EXTENSIONS = {"CSV": ".csv", "Parquet": ".parquet", "Feather": ".feather"}
+
+# Worker processes copying part files during a byte-range row-count split
+SPLIT_WORKERS = os.cpu_count() or 1
+
+# Maximum output files held open at once during a column-value split
+MAX_OPEN_WRITERS = 128
+
+# Bit width of the Arrow integer type used for each MySQL integer type
+ARROW_INTEGER_BITS = {"tinyint": 8, "smallint": 16, "mediumint": 32, "int": 32, "integer": 32, "bigint": 64, "bit": 64}
+
+class ChunkWriter:
+    # Append DataFrame chunks to one CSV, Parquet or Feather file as they arrive; each chunk
+    # becomes a Parquet row group or a Feather record batch
+    def __init__(self, path, schema=None, header=True, append=False, level=None):
+        self.path = path
+        self.format = FileHandler.file_format(path)
+        self.schema = schema
+        self.header = header and not append
+        self._file = None
+        self._writer = None
+
+        if self.format == "csv":
+            self._file = FileHandler.open_text(path, "a" if append else "w", level)
+        else:
+            FileHandler.require_arrow(self.format)
+
+    def write(self, df):
+        # Append one chunk; Arrow formats keep the schema of the first chunk (or the one given)
+        if self.format == "csv":
+            df.to_csv(self._file, index=False, header=self.header)
+            self.header = False
+            return
+
+        self.write_arrow(FileHandler.to_arrow(df, self.schema))
+
+    def write_arrow(self, table):
+        # Append an Arrow table to a Parquet or Feather file, cast to the file's schema (the one given,
+        # else the first table's)
+        if self._writer is None:
+            self.schema = self.schema or table.schema
+            self._writer = self._open_arrow()
+        if not table.schema.equals(self.schema):
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+
+    def _open_arrow(self):
+        # Start the Parquet or Feather (Arrow IPC file) writer
+        if self.format == "parquet":
+            return pq.ParquetWriter(self.path, self.schema)
+        return pa.ipc.new_file(self.path, self.schema)
+
+    def close(self):
+        # Finish the file; an Arrow file without chunks still gets its schema written
+        if self._file is not None:
+            self._file.close()
+            return
+        if self._writer is None:
+            if self.schema is None:
+                self.schema = pa.schema([])
+            self._writer = self._open_arrow()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class WriterPool:
+    # Append DataFrames to many output files, keeping only the most recently used ones open.
+    # CSVs are reopened for appending (compressed ones get a new gzip member / compressed stream);
+    # Parquet/Feather files cannot be, so rows arriving after an eviction are spilled to temporary
+    # Arrow files and folded back into one file per path when the pool is closed
+    def __init__(self, max_open=MAX_OPEN_WRITERS, schema=None, level=None):
+        self.max_open = max_open
+        self.schema = schema
+        self.level = level
+        self._open = OrderedDict()
+        self._created = {}
+        self._spills = {}
+        self._folder = None
+
+    def write(self, path, df):
+        # Append rows to path, writing the CSV header the first time the file is created
+        writer = self._open.get(path)
+        if writer is None:
+            if len(self._open) >= self.max_open:
+                _, oldest = self._open.popitem(last=False)
+                oldest.close()
+
+            opened = self._created.get(path, 0)
+            self._created[path] = opened + 1
+            if FileHandler.file_format(path) == "csv":
+                writer = ChunkWriter(path, append=opened > 0, level=self.level)
+            elif opened:
+                writer = ChunkWriter(self._spill_path(path), self.schema)
+            else:
+                writer = ChunkWriter(path, self.schema)
+            self._open[path] = writer
+        else:
+            self._open.move_to_end(path)
+        writer.write(df)
+
+    def _spill_path(self, path):
+        # New temporary Arrow file for rows of path that arrive after its writer was evicted
+        if self._folder is None:
+            self._folder = tempfile.mkdtemp(prefix=".split_", dir=os.path.dirname(path) or None)
+        spills = self._spills.setdefault(path, [])
+        spills.append(os.path.join(self._folder, f"{sum(map(len, self._spills.values()))}.arrow"))
+        return spills[-1]
+
+    def _merge(self, path, spills):
+        # Rewrite path with its spilled rows appended, as a single file
+        merged = os.path.join(self._folder, "merged" + FileHandler.split_extension(path)[1])
+        sources = [path] + spills
+        schema = self.schema or pa.unify_schemas(
+            [FileHandler.read_schema(source).remove_metadata() for source in sources], promote_options="permissive"
+        )
+        with ChunkWriter(merged, schema) as writer:
+            for source in sources:
+                for batch in FileHandler.arrow_batches(source):
+                    writer.write_arrow(pa.Table.from_batches([batch]))
+        os.replace(merged, path)
+
+    def close(self, finish=True):
+        # Close every file still held open, then fold spilled rows into their files
+        # (skipped when finish is False, e.g. after a failure)
+        try:
+            while self._open:
+                _, writer = self._open.popitem()
+                writer.close()
+            if finish:
+                for path, spills in self._spills.items():
+                    self._merge(path, spills)
+        finally:
+            if self._folder is not None:
+                shutil.rmtree(self._folder, ignore_errors=True)
+                self._folder = None
+            self._spills = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(finish=exc_type is None)
 
 class FileHandler:
+    @staticmethod
+    def file_format(file_path):
+        # Format of a data file from its extension: "csv", "parquet" or "feather";
+        # only CSV may carry a compression suffix (.csv.gz, .csv.zst, ...)
+        _, ext = FileHandler.split_extension(file_path)
+        ext = ext.lower()
+        compression = COMPRESSION_SUFFIXES.get(os.path.splitext(ext)[1])
+        if compression:
+            ext = os.path.splitext(ext)[0]
+        if ext not in FILE_FORMATS or (compression and FILE_FORMATS[ext] != "csv"):
+            raise ValueError(f"Unsupported file type '{ext}'.")
+        return FILE_FORMATS[ext]
+
+    @staticmethod
+    def split_extension(file_path):
+        # Split a path into (stem, extension), keeping a compression suffix with its format: ("data", ".csv.gz")
+        stem, ext = os.path.splitext(file_path)
+        if ext.lower() in COMPRESSION_SUFFIXES:
+            stem, inner = os.path.splitext(stem)
+            ext = inner + ext
+        return stem, ext
+
+    @staticmethod
+    def compression(file_path, sniff=True):
+        # Compression codec of a file from its suffix, or (for existing files) its magic bytes
+        codec = COMPRESSION_SUFFIXES.get(os.path.splitext(file_path)[1].lower())
+        if codec or not sniff or not os.path.isfile(file_path):
+            return codec
+
+        with open(file_path, "rb") as file:
+            head = file.read(6)
+        for magic, codec in COMPRESSION_MAGIC.items():
+            if head.startswith(magic):
+                return codec
+        return None
+
+    @staticmethod
+    def open_text(file_path, mode="r", level=None):
+        # Open a CSV for streaming text reads ("r") or writes ("w"/"a"), (de)compressing on the fly;
+        # zstd writes use all cores, the other codecs compress on one thread
+        codec = FileHandler.compression(file_path, sniff=mode == "r")
+        if codec is None:
+            return open(file_path, mode, newline="", encoding="utf-8")
+
+        if level is None:
+            level = COMPRESSION_LEVELS[codec][2]
+        text_mode = mode + "t"
+        if codec == "gzip":
+            return gzip.open(file_path, text_mode, compresslevel=level, newline="", encoding="utf-8")
+        if codec == "bz2":
+            return bz2.open(file_path, text_mode, compresslevel=level, newline="", encoding="utf-8")
+        if codec == "xz":
+            preset = None if mode == "r" else level
+            return lzma.open(file_path, text_mode, preset=preset, newline="", encoding="utf-8")
+
+        if zstandard is None:
+            raise ValueError("zstd files require zstandard (pip install zstandard).")
+        raw = open(file_path, mode + "b")
+        if mode == "r":
+            # Files written in several sessions hold several zstd frames
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=level, threads=-1).stream_writer(raw)
+        return io.TextIOWrapper(stream, newline="", encoding="utf-8")
+
+    @staticmethod
+    def require_arrow(file_format):
+        # Fail clearly when a Parquet/Feather file is used without pyarrow installed
+        if pa is None:
+            raise ValueError(f"{file_format.capitalize()} files require pyarrow (pip install pyarrow).")
+
     @staticmethod
     def read_csv(file_path):
-        # Load a CSV file into a DataFrame
-        return pd.read_csv(file_path)
+        # Load a (possibly compressed) CSV file into a DataFrame, on all cores for large files
+        source = FileHandler._parallel_source(file_path)
+        if source is not None:
+            with source:
+                return pa_csv.read_csv(
+                    source,
+                    read_options=pa_csv.ReadOptions(use_threads=True, block_size=PARSE_BLOCK_SIZE),
+                    # Quoted fields may span lines; the block chunker must respect quotes
+                    parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                    convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+                ).to_pandas()
+
+        with FileHandler.open_text(file_path) as file:
+            return pd.read_csv(file)
+
+    @staticmethod
+    def _parallel_source(file_path):
+        # Binary stream for pyarrow's CSV reader, or None to parse with pandas
+        # (pyarrow missing, file below PARALLEL_PARSE_BYTES, or a codec pyarrow can't stream)
+        if pa is None or os.path.getsize(file_path) < PARALLEL_PARSE_BYTES:
+            return None
+        codec = FileHandler.compression(file_path)
+        if codec and codec not in ARROW_CODECS:
+            return None
+        return pa.input_stream(file_path, compression=codec)
+
+    @staticmethod
+    def read_file(file_path):
+        # Load a CSV, Parquet or Feather file into a DataFrame, keeping Arrow column types
+        file_format = FileHandler.file_format(file_path)
+        if file_format == "csv":
+            return FileHandler.read_csv(file_path)
+
+        FileHandler.require_arrow(file_format)
+        if file_format == "parquet":
+            return pq.read_table(file_path).to_pandas()
+        with pa.memory_map(file_path) as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    @staticmethod
+    def row_index(file_path):
+        # Sidecar row-offset index of an uncompressed CSV (built on first use), or None for other files
+        if FileHandler.file_format(file_path) != "csv" or FileHandler.compression(file_path) is not None:
+            return None
+        return RowIndex.for_file(file_path)
+
+    @staticmethod
+    def count_rows(file_path):
+        # Number of data rows, from the row index or file metadata where possible
+        index = FileHandler.row_index(file_path)
+        if index is not None:
+            return index.rows
+
+        file_format = FileHandler.file_format(file_path)
+        if file_format == "parquet":
+            FileHandler.require_arrow(file_format)
+            return pq.ParquetFile(file_path).metadata.num_rows
+        with FileHandler.read_chunks(file_path, raw=True) as reader:
+            return sum(len(chunk) for chunk in reader)
+
+    @staticmethod
+    def read_rows(file_path, start=0, count=None):
+        # Rows [start, start + count) of a file (to the end when count is None); plain CSVs seek
+        # there through the row index, other files are read and sliced
+        index = FileHandler.row_index(file_path)
+        if index is not None:
+            return index.read_rows(start, count)
+
+        df = FileHandler.read_file(file_path)
+        return df.iloc[start:None if count is None else start + count].reset_index(drop=True)
+
+    @staticmethod
+    @contextmanager
+    def read_csv_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE, raw=False):
+        # Stream a (possibly compressed) CSV as DataFrame chunks; raw keeps every field as its original text.
+        # Large raw reads are parsed by pyarrow on all cores, in blocks rather than chunk_size rows
+        # (typed reads stay on pandas: pyarrow fixes column types from the first block)
+        source = FileHandler._parallel_source(file_path) if raw else None
+        if source is not None:
+            columns = FileHandler.read_columns(file_path)
+            with source:
+                reader = pa_csv.open_csv(
+                    source,
+                    read_options=pa_csv.ReadOptions(use_threads=True, block_size=PARSE_BLOCK_SIZE),
+                    # Quoted fields may span lines; the block chunker must respect quotes
+                    parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types={col: pa.string() for col in columns},
+                        null_values=[],
+                        strings_can_be_null=False,
+                    ),
+                )
+                yield (batch.to_pandas() for batch in reader)
+            return
+
+        with FileHandler.open_text(file_path) as file:
+            if raw:
+                reader = pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+            else:
+                reader = pd.read_csv(file, chunksize=chunk_size)
+            with reader:
+                yield reader
+
+    @staticmethod
+    def read_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE, raw=False):
+        # Stream any supported file as DataFrame chunks (use as a context manager);
+        # raw only applies to CSV, Parquet/Feather chunks keep their stored types
+        file_format = FileHandler.file_format(file_path)
+        if file_format == "csv":
+            return FileHandler.read_csv_chunks(file_path, chunk_size, raw)
+
+        FileHandler.require_arrow(file_format)
+        return closing(FileHandler._arrow_chunks(file_path, file_format, chunk_size))
+
+    @staticmethod
+    def _arrow_chunks(file_path, file_format, chunk_size):
+        # Yield Parquet row-group batches or Feather record batches as DataFrames
+        if file_format == "parquet":
+            with pq.ParquetFile(file_path) as parquet_file:
+                for batch in parquet_file.iter_batches(batch_size=chunk_size):
+                    yield batch.to_pandas()
+            return
+
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for offset in range(0, batch.num_rows, chunk_size):
+                    yield batch.slice(offset, chunk_size).to_pandas()
+
+    @staticmethod
+    def arrow_batches(file_path):
+        # Yield the record batches of a Parquet or Feather file as stored
+        if FileHandler.file_format(file_path) == "parquet":
+            with pq.ParquetFile(file_path) as parquet_file:
+                yield from parquet_file.iter_batches()
+            return
+
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+    @staticmethod
+    def read_columns(file_path):
+        # Read only the column names (the CSV header row or the Arrow schema)
+        schema = FileHandler.read_schema(file_path)
+        if schema is None:
+            with FileHandler.open_text(file_path) as file:
+                return pd.read_csv(file, nrows=0).columns.tolist()
+        return schema.names
+
+    @staticmethod
+    def read_schema(file_path):
+        # Arrow schema of a Parquet/Feather file, or None for CSV
+        file_format = FileHandler.file_format(file_path)
+        if file_format == "csv":
+            return None
+
+        FileHandler.require_arrow(file_format)
+        if file_format == "parquet":
+            schema = pq.read_schema(file_path)
+        else:
+            with pa.memory_map(file_path) as source:
+                schema = pa.ipc.open_file(source).schema
+        return schema.remove_metadata()
+
+    @staticmethod
+    def to_arrow(df, schema=None):
+        # Convert a DataFrame chunk to an Arrow table, cast to schema when one is given
+        table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+        return table.replace_schema_metadata(None)
+
+    @staticmethod
+    def arrow_schema(column_types):
+        # Arrow schema matching MySQL column types ({column: COLUMN_TYPE}), so downloads keep their types
+        if pa is None:
+            return None
+
+        fields = []
+        for col, sql_type in column_types.items():
+            sql_type = sql_type.lower()
+            base = re.match(r"[a-z]+", sql_type).group(0)
+            unsigned = "unsigned" in sql_type
+
+            if base in ARROW_INTEGER_BITS:
+                bits = ARROW_INTEGER_BITS[base]
+                arrow_type = pa.int64() if base == "bit" else getattr(pa, f"{'u' if unsigned else ''}int{bits}")()
+            elif base in ("decimal", "numeric"):
+                digits = re.search(r"\((\d+)(?:,\s*(\d+))?\)", sql_type)
+                precision = int(digits.group(1)) if digits else 10
+                scale = int(digits.group(2) or 0) if digits else 0
+                arrow_type = pa.decimal128(precision, scale) if precision <= 38 else pa.decimal256(precision, scale)
+            elif base == "float":
+                arrow_type = pa.float32()
+            elif base in ("double", "real"):
+                arrow_type = pa.float64()
+            elif base == "date":
+                arrow_type = pa.date32()
+            elif base in ("datetime", "timestamp"):
+                arrow_type = pa.timestamp("us")
+            elif base == "time":
+                arrow_type = pa.duration("us")
+            elif base == "year":
+                arrow_type = pa.int16()
+            elif base in ("binary", "varbinary") or base.endswith("blob"):
+                arrow_type = pa.binary()
+            else:
+                arrow_type = pa.string()
+            fields.append(pa.field(col, arrow_type))
+        return pa.schema(fields)
 
     @staticmethod
     def normalize_columns(columns):
@@ -19,7 +493,44 @@ class FileHandler:
         df.to_csv(path, index=False)
 
     @staticmethod
-    def get_files(path, target=".csv"):
+    def write_chunks(path, chunks, header=True, schema=None, level=None):
+        # Write DataFrame chunks to a CSV (compressed per its suffix, at level), Parquet or Feather
+        # file as they arrive (CSV header once; Arrow formats cast every chunk to schema when given)
+        rows = 0
+        try:
+            with ChunkWriter(path, schema, header, level=level) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+                    rows += len(chunk)
+        except BaseException:
+            # Don't leave a truncated file behind
+            if os.path.isfile(path):
+                os.remove(path)
+            raise
+        return rows
+
+    @staticmethod
+    def concat_files(paths, dest_path):
+        # Concatenate files into dest_path, removing the inputs; CSV parts (compressed ones too,
+        # as concatenated gzip members / streams / frames) are joined byte for byte,
+        # Parquet/Feather parts are rewritten batch by batch
+        if FileHandler.file_format(dest_path) != "csv":
+            FileHandler.write_chunks(
+                dest_path,
+                (chunk for path in paths for chunk in FileHandler._arrow_chunks(
+                    path, FileHandler.file_format(path), DEFAULT_CHUNK_SIZE)),
+                schema=FileHandler.read_schema(paths[0]),
+            )
+        else:
+            with open(dest_path, "wb") as dest:
+                for path in paths:
+                    with open(path, "rb") as src:
+                        shutil.copyfileobj(src, dest, 1024 * 1024)
+        for path in paths:
+            os.remove(path)
+
+    @staticmethod
+    def get_files(path, target=DATA_EXTENSIONS):
         # Return list of files that match target extension
         if os.path.isfile(path) and path.lower().endswith(target):
             return [path]
@@ -31,6 +542,19 @@ class FileHandler:
             ]
         return []
 
+    @staticmethod
+    def output_extension(file_path, compression=None):
+        # Extension for files derived from file_path: same format, CSV with the chosen compression suffix
+        if FileHandler.file_format(file_path) != "csv":
+            return FileHandler.split_extension(file_path)[1].lower()
+        return FileHandler.csv_extension(compression)
+
+    @staticmethod
+    def csv_extension(compression=None):
+        # ".csv" plus the suffix of the chosen compression codec, if any
+        suffixes = {codec: suffix for suffix, codec in COMPRESSION_SUFFIXES.items()}
+        return ".csv" + suffixes.get(compression, "")
+
     @staticmethod
     def file_exists(path):
         # Check if file exists at the given path
@@ -38,17 +562,19 @@ class FileHandler:
 
     @staticmethod
     def normalize_name(name, max_length=100):
-        # Normalize a name: strip extension, lowercase, replace separators, trim non-alphanumerics
-        name = os.path.splitext(os.path.basename(name))[0].lower()
+        # Normalize a name: strip extension (and compression suffix), lowercase, replace separators,
+        # trim non-alphanumerics
+        name = FileHandler.split_extension(os.path.basename(name))[0].lower()
         name = re.sub(r"[ \-:\.]+", "_", name)
         name = re.sub(r"[^\w]", "", name)
         return name[:max_length].strip("_")
 
     @staticmethod
-    def split(file_path, output_path, split_type, split_value):
-        # Split a CSV into multiple files by row count or column value
-        df = FileHandler.read_csv(file_path)
-        base_name = FileHandler.normalize_name(os.path.splitext(os.path.basename(file_path))[0])
+    def split(file_path, output_path, split_type, split_value, compression=None, level=None):
+        # Split a CSV, Parquet or Feather file into multiple files of the same format by row count or
+        # column value; CSV output is compressed with the given codec ("gzip", "bz2", "xz", "zstd")
+        base_name = FileHandler.normalize_name(FileHandler.split_extension(os.path.basename(file_path))[0])
+        ext = FileHandler.output_extension(file_path, compression)
 
         if split_type == "row_count":
             # Split by fixed number of rows
@@ -59,23 +585,95 @@ class FileHandler:
             except ValueError:
                 raise ValueError("Invalid split value for row count.")
 
-            for i in range(0, len(df), count):
-                chunk = df.iloc[i:i + count]
-                chunk_index = i // count + 1
-                chunk_name = FileHandler.normalize_name(f"{base_name}_part_{chunk_index}")
-                full_path = os.path.join(output_path, f"{chunk_name}.csv")
-                FileHandler.write_csv(full_path, chunk)
+            if FileHandler._byte_copy_allowed(file_path, ext):
+                FileHandler._split_by_bytes(file_path, output_path, base_name, ext, count)
+            else:
+                FileHandler._split_by_rows(file_path, output_path, base_name, ext, count, level)
 
         elif split_type == "column_value":
             # Split by unique values in a specific column
-            if split_value not in df.columns:
+            columns = FileHandler.read_columns(file_path)
+            if split_value not in columns:
                 raise ValueError(f"Column '{split_value}' not found in file.")
 
-            for val, group in df.groupby(split_value):
-                safe_val = FileHandler.normalize_name(str(val))
-                chunk_name = FileHandler.normalize_name(f"{base_name}_{safe_val}")
-                full_path = os.path.join(output_path, f"{chunk_name}.csv")
-                FileHandler.write_csv(full_path, group)
+            FileHandler._split_by_column(file_path, output_path, base_name, ext, split_value, level)
 
         else:
             raise ValueError("Unsupported split type.")
+
+    @staticmethod
+    def _byte_copy_allowed(file_path, ext):
+        # Parts can be raw byte ranges of the input when both are uncompressed CSV
+        return ext == ".csv" and FileHandler.file_format(file_path) == "csv" and FileHandler.compression(file_path) is None
+
+    @staticmethod
+    def _split_by_bytes(file_path, output_path, base_name, ext, count, workers=SPLIT_WORKERS):
+        # Copy each part's byte range (with the header prepended) in a pool of worker processes;
+        # each worker finds its exact record boundaries from the nearest row-index offsets
+        index = FileHandler.row_index(file_path)
+        if not index.rows:
+            return
+
+        part_rows = range(0, index.rows, count)
+        part_paths = [
+            os.path.join(output_path, f"{FileHandler.normalize_name(f'{base_name}_part_{i}')}{ext}")
+            for i in range(1, len(part_rows) + 1)
+        ]
+
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(part_paths)))) as executor:
+            futures = [
+                executor.submit(
+                    CsvScanner.copy_records,
+                    file_path,
+                    index.header_end,
+                    index.locate(first),
+                    index.locate(first + count) if first + count < index.rows else (index.fingerprint["size"], 0),
+                    part_path,
+                )
+                for first, part_path in zip(part_rows, part_paths)
+            ]
+            for future in futures:
+                future.result()
+
+    @staticmethod
+    def _split_by_rows(file_path, output_path, base_name, ext, count, level):
+        # Stream the input and roll over to a new part file every `count` rows
+        schema = FileHandler.read_schema(file_path)
+        part_writer = None
+        part_index = 0
+        part_rows = count
+
+        try:
+            with FileHandler.read_chunks(file_path, raw=True) as reader:
+                for chunk in reader:
+                    start = 0
+                    while start < len(chunk):
+                        if part_rows == count:
+                            if part_writer:
+                                part_writer.close()
+                            part_index += 1
+                            chunk_name = FileHandler.normalize_name(f"{base_name}_part_{part_index}")
+                            part_writer = ChunkWriter(os.path.join(output_path, f"{chunk_name}{ext}"), schema, level=level)
+                            part_rows = 0
+
+                        take = min(count - part_rows, len(chunk) - start)
+                        part_writer.write(chunk.iloc[start:start + take])
+                        part_rows += take
+                        start += take
+        finally:
+            if part_writer:
+                part_writer.close()
+
+    @staticmethod
+    def _split_by_column(file_path, output_path, base_name, ext, column, level):
+        # Stream the input and append each chunk's groups to per-value files
+        schema = FileHandler.read_schema(file_path)
+        with FileHandler.read_chunks(file_path, raw=True) as reader, WriterPool(schema=schema, level=level) as writers:
+            for chunk in reader:
+                # Rows with an empty split value are skipped, as groupby skips missing values
+                chunk = chunk[chunk[column] != ""]
+                for val, group in chunk.groupby(column, sort=False):
+                    safe_val = FileHandler.normalize_name(str(val))
+                    chunk_name = FileHandler.normalize_name(f"{base_name}_{safe_val}")
+                    full_path = os.path.join(output_path, f"{chunk_name}{ext}")
+                    writers.write(full_path, group)
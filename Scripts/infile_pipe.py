@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import threading
+
+# Named pipes are POSIX-only; elsewhere the chunks are spooled to a temporary file. Windows pipes
+# (\\.\pipe\...) do not work here: the connector checks the path with os.path.exists, which on
+# Windows opens the pipe and can use up the instance the load would read from
+FIFO_SUPPORTED = hasattr(os, "mkfifo")
+
+# Bytes discarded per read while unblocking a writer nobody is reading from
+DRAIN_SIZE = 65536
+
+class InfilePipe:
+    # A path for LOAD DATA LOCAL INFILE whose contents come from an iterable of byte chunks,
+    # written by a background thread into a named pipe so nothing is copied to disk
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.path = None
+        self.error = None
+        self._folder = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        self._folder = tempfile.mkdtemp(prefix="infile_")
+        self.path = os.path.join(self._folder, "rows.csv")
+
+        if not FIFO_SUPPORTED:
+            with open(self.path, "wb") as file:
+                for chunk in self.chunks:
+                    file.write(chunk)
+            return self
+
+        os.mkfifo(self.path, 0o600)
+        self._thread = threading.Thread(target=self._feed, daemon=True)
+        self._thread.start()
+        return self
+
+    def _feed(self):
+        # Block until the driver opens the pipe, then write every chunk; a reader that went
+        # away (failed statement) ends the write quietly, a failing generator is kept for check()
+        try:
+            with open(self.path, "wb") as pipe:
+                for chunk in self.chunks:
+                    if self._stopped.is_set():
+                        break
+                    pipe.write(chunk)
+        except BrokenPipeError:
+            pass
+        except BaseException as e:
+            self.error = e
+
+    def check(self):
+        # Wait for the writer and re-raise a generator failure, since the server then got partial data
+        if self._thread is not None:
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __exit__(self, *exc_info):
+        # Release a writer still waiting for (or writing to) a reader, then remove the pipe
+        if self._thread is not None and self._thread.is_alive():
+            self._stopped.set()
+            fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            try:
+                while self._thread.is_alive():
+                    try:
+                        data = os.read(fd, DRAIN_SIZE)
+                    except BlockingIOError:
+                        data = b""
+                    if not data:
+                        self._thread.join(0.01)
+            finally:
+                os.close(fd)
+            self._thread.join()
+
+        shutil.rmtree(self._folder, ignore_errors=True)
+        return False
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# Share of max_allowed_packet one INSERT may fill, leaving room for protocol overhead
+PACKET_FILL = 0.9
+
+# Rows per INSERT: starting point and bounds for the adaptive batch size
+INITIAL_BATCH_ROWS = 1000
+MIN_BATCH_ROWS = 1
+MAX_BATCH_ROWS = 100000
+
+# Statement time the adaptive batch size aims for, in seconds
+TARGET_BATCH_SECONDS = 0.5
+
+# Replacements for string literals when backslash escapes are enabled; the backslash goes first
+BACKSLASH_ESCAPES = [
+    ("\\", "\\\\"),
+    ("\x00", "\\0"),
+    ("'", "\\'"),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+    ("\x1a", "\\Z"),
+]
+
+class BatchSizer:
+    # Row cap per INSERT, adjusted from measured statement latency
+    def __init__(self, rows=INITIAL_BATCH_ROWS, target_seconds=TARGET_BATCH_SECONDS):
+        self.rows = rows
+        self.target_seconds = target_seconds
+
+    def record(self, rows, seconds):
+        # Move the cap toward the target latency, at most doubling or halving per statement
+        factor = min(2.0, max(0.5, self.target_seconds / max(seconds, 1e-3)))
+        # A fast statement that was cut short by the packet size says nothing about the cap
+        if rows < self.rows and factor >= 1:
+            return
+        self.rows = int(min(MAX_BATCH_ROWS, max(MIN_BATCH_ROWS, rows * factor)))
+
+class InsertBuilder:
+    @staticmethod
+    def row_literals(df: pd.DataFrame, backslash_escapes=True):
+        # Each row rendered as a "(v1, v2, ...)" SQL literal, built column by column with
+        # vectorized string operations instead of per-value driver conversion
+        columns = [InsertBuilder.column_literals(df[col], backslash_escapes) for col in df.columns]
+        if not columns:
+            return pd.Series(["()"] * len(df), index=df.index, dtype=object)
+        joined = columns[0].str.cat(columns[1:], sep=", ") if len(columns) > 1 else columns[0]
+        return "(" + joined + ")"
+
+    @staticmethod
+    def column_literals(series: pd.Series, backslash_escapes=True):
+        # One column as SQL literals: NULL for NaN/NaT, 1/0 for booleans, TIME text for
+        # timedeltas, quoted and escaped text for everything else
+        missing = series.isna().to_numpy()
+        if InsertBuilder.is_boolean(series):
+            text = pd.Series(np.where(series.fillna(False).astype(bool), "1", "0"), index=series.index)
+        elif pd.api.types.is_timedelta64_dtype(series):
+            text = "'" + InsertBuilder.time_text(series) + "'"
+        elif pd.api.types.is_numeric_dtype(series):
+            InsertBuilder.reject_infinite(series)
+            text = series.astype(str)
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            text = "'" + series.dt.strftime("%Y-%m-%d %H:%M:%S.%f") + "'"
+        else:
+            text = "'" + InsertBuilder.escape(series.astype(str), backslash_escapes) + "'"
+        return text.astype(object).where(~missing, "NULL").astype(str)
+
+    @staticmethod
+    def reject_infinite(series: pd.Series):
+        # MySQL has no infinity; fail instead of silently changing the value (both upload paths use this)
+        if pd.api.types.is_float_dtype(series):
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            if np.isinf(values).any():
+                raise ValueError(f"Column '{series.name}' contains infinite values, which MySQL cannot store.")
+
+    @staticmethod
+    def time_text(series: pd.Series):
+        # Timedeltas as MySQL TIME text, [-]HH:MM:SS[.ffffff] with hours past 24 allowed
+        # (missing values come out as "00:00:00"; callers mask them)
+        micros = series.to_numpy(dtype="timedelta64[us]").astype(np.int64)
+        micros[series.isna().to_numpy()] = 0
+        sign = np.where(micros < 0, "-", "")
+        seconds, fraction = np.divmod(np.abs(micros), 1000000)
+        minutes, seconds = np.divmod(seconds, 60)
+        hours, minutes = np.divmod(minutes, 60)
+
+        def digits(values, width):
+            return pd.Series(values, index=series.index).astype(str).str.zfill(width)
+
+        text = sign + digits(hours, 2) + ":" + digits(minutes, 2) + ":" + digits(seconds, 2)
+        return text.where(fraction == 0, text + "." + digits(fraction, 6))
+
+    @staticmethod
+    def is_boolean(series: pd.Series):
+        # Bool columns, including object columns of True/False with blanks (which would render as 'True')
+        if pd.api.types.is_bool_dtype(series):
+            return True
+        return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "boolean"
+
+    @staticmethod
+    def escape(text: pd.Series, backslash_escapes=True):
+        # Escape string contents the way the server parses them (per NO_BACKSLASH_ESCAPES)
+        if not backslash_escapes:
+            return text.str.replace("'", "''", regex=False)
+        for character, escaped in BACKSLASH_ESCAPES:
+            text = text.str.replace(character, escaped, regex=False)
+        return text
+
+    @staticmethod
+    def batches(widths, budget, sizer: BatchSizer):
+        # Yield (start, end) row ranges that fit the byte budget and the sizer's current row cap
+        total = np.cumsum(widths)
+        start = 0
+        while start < len(widths):
+            base = total[start - 1] if start else 0
+            end = int(np.searchsorted(total, base + budget, side="right"))
+            if end == start:
+                raise ValueError(f"Row {start} is larger than max_allowed_packet allows.")
+            end = min(end, start + sizer.rows)
+            yield start, end
+            start = end
+
+    @staticmethod
+    def header(table_name, columns):
+        # "INSERT INTO ... VALUES " prefix the row literals are appended to
+        names = ", ".join(f"`{col}`" for col in columns)
+        return f"INSERT INTO `{table_name}` ({names}) VALUES "
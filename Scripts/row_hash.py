@@ -0,0 +1,91 @@
+import hashlib
+import re
+from decimal import Decimal, InvalidOperation
+import pandas as pd
+
+# Separator between fields and marker for NULL in hashed rows; the server side of
+# the comparison uses the same characters (see RowHasher.server_expression)
+FIELD_SEPARATOR = "\x1f"
+NULL_MARKER = "\x1e"
+
+class RowHasher:
+    @staticmethod
+    def server_expression(column_types):
+        # SQL that renders every column like CAST(... AS CHAR) and hashes the joined row
+        fields = ", ".join(
+            f"IFNULL(CAST(`{col}` AS CHAR), CHAR(30 USING utf8mb4))" for col in column_types
+        )
+        return f"MD5(CONCAT_WS(CHAR(31 USING utf8mb4), {fields}))"
+
+    @staticmethod
+    def server_key_expression(key_columns):
+        # SQL rendering the key columns the same way the client renders them
+        fields = ", ".join(
+            f"IFNULL(CAST(`{col}` AS CHAR), CHAR(30 USING utf8mb4))" for col in key_columns
+        )
+        return f"CONCAT_WS(CHAR(31 USING utf8mb4), {fields})"
+
+    @staticmethod
+    def hash_rows(df: pd.DataFrame, column_types):
+        # MD5 of each row, formatted the way MySQL casts the target column types to text
+        return RowHasher.join_columns(df, column_types).map(
+            lambda row: hashlib.md5(row.encode("utf-8")).hexdigest()
+        )
+
+    @staticmethod
+    def join_columns(df: pd.DataFrame, column_types):
+        # Render the given columns as text and join them into one string per row
+        rendered = [RowHasher.render(df[col], sql_type) for col, sql_type in column_types.items()]
+        joined = rendered[0]
+        if len(rendered) > 1:
+            joined = joined.str.cat(rendered[1:], sep=FIELD_SEPARATOR)
+        return joined
+
+    @staticmethod
+    def render(series: pd.Series, sql_type):
+        # Format values like MySQL's CAST(value AS CHAR) for the given column type; only used to
+        # spot changed rows, so a mismatch costs a redundant update, never a missed change or a delete
+        sql_type = sql_type.lower()
+        base = re.match(r"[a-z]+", sql_type).group(0)
+        fsp = re.search(r"\((\d+)\)", sql_type)
+        missing = series.isna()
+
+        if base in ("tinyint", "smallint", "mediumint", "int", "integer", "bigint"):
+            values = series.map(lambda v: str(int(v)) if not pd.isna(v) else NULL_MARKER)
+        elif base == "decimal":
+            scale = int(re.search(r",\s*(\d+)\)", sql_type).group(1)) if "," in sql_type else 0
+            values = series.map(lambda v: RowHasher._render_decimal(v, scale))
+        elif base in ("float", "double", "real"):
+            values = series.map(RowHasher._render_float)
+        elif base == "date":
+            values = pd.to_datetime(series, errors="coerce").dt.strftime("%Y-%m-%d")
+        elif base in ("datetime", "timestamp"):
+            stamps = pd.to_datetime(series, errors="coerce", format="mixed")
+            values = stamps.dt.strftime("%Y-%m-%d %H:%M:%S")
+            if fsp and int(fsp.group(1)) > 0:
+                digits = int(fsp.group(1))
+                values = values + "." + stamps.dt.strftime("%f").str[:digits]
+        else:
+            values = series.astype(str)
+
+        return values.astype(object).where(~missing & values.notna(), NULL_MARKER).astype(str)
+
+    @staticmethod
+    def _render_decimal(value, scale):
+        # Fixed-point text with exactly `scale` digits, as MySQL prints DECIMAL(p,s)
+        if pd.isna(value):
+            return NULL_MARKER
+        try:
+            return f"{Decimal(str(value)):.{scale}f}"
+        except InvalidOperation:
+            return str(value)
+
+    @staticmethod
+    def _render_float(value):
+        # Shortest round-trip text, as MySQL 8 prints FLOAT/DOUBLE
+        if pd.isna(value):
+            return NULL_MARKER
+        text = repr(float(value))
+        if text.endswith(".0"):
+            text = text[:-2]
+        return re.sub(r"e([+-])0*(\d)", lambda m: "e" + ("-" if m.group(1) == "-" else "") + m.group(2), text)
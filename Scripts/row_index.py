@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import pandas as pd
+from Scripts.csv_scanner import CsvScanner
+
+# Suffix of the index file written next to the CSV it describes
+INDEX_SUFFIX = ".rowidx"
+
+# Every INDEX_STEP-th record's byte offset is recorded
+INDEX_STEP = 100000
+
+# Bumped whenever the scanner's notion of a record changes, so older sidecars are rebuilt
+INDEX_VERSION = 2
+
+class RowIndex:
+    # Byte offsets of every `step`-th record of an uncompressed CSV, cached in a sidecar JSON file
+    # and rebuilt whenever the CSV's size or modification time changes
+    def __init__(self, file_path, fingerprint, header, header_end, offsets, rows, step=INDEX_STEP):
+        self.file_path = file_path
+        self.fingerprint = fingerprint
+        self.header = header
+        self.header_end = header_end
+        self.offsets = offsets
+        self.rows = rows
+        self.step = step
+
+    @staticmethod
+    def for_file(file_path, step=INDEX_STEP):
+        # Load the sidecar index if it still matches the file, otherwise scan the file and save a new one
+        stat = os.stat(file_path)
+        fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "step": step, "version": INDEX_VERSION}
+        path = file_path + INDEX_SUFFIX
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                saved = json.load(file)
+            if saved.get("fingerprint") == fingerprint:
+                return RowIndex(
+                    file_path, fingerprint, saved["header"], saved["header_end"], saved["offsets"], saved["rows"], step
+                )
+        except (OSError, ValueError, KeyError):
+            pass
+
+        header_end, offsets, rows = CsvScanner.scan(file_path, step)
+        with open(file_path, "rb") as file:
+            header = file.read(header_end).decode("utf-8")
+        index = RowIndex(file_path, fingerprint, header, header_end, offsets, rows, step)
+        index.save()
+        return index
+
+    def save(self):
+        # Write the sidecar (atomically); a read-only folder just means the index is rebuilt next time
+        path = self.file_path + INDEX_SUFFIX
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({
+                    "fingerprint": self.fingerprint,
+                    "header": self.header,
+                    "header_end": self.header_end,
+                    "offsets": self.offsets,
+                    "rows": self.rows,
+                }, file)
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+    def locate(self, row):
+        # (byte offset of the nearest indexed record at or before data row `row`, records left to skip)
+        block = min(row // self.step, len(self.offsets))
+        offset = self.offsets[block - 1] if block else self.header_end
+        return offset, row - block * self.step
+
+    def columns(self):
+        # Column names from the stored header line
+        return pd.read_csv(io.StringIO(self.header), nrows=0).columns.tolist()
+
+    def read_rows(self, start=0, count=None):
+        # DataFrame of `count` rows (all remaining when None) from data row `start`, seeking past
+        # everything before it instead of parsing it
+        offset = CsvScanner.advance(self.file_path, *self.locate(start))
+        with open(self.file_path, "rb") as file:
+            file.seek(offset)
+            if offset >= self.fingerprint["size"]:
+                return pd.DataFrame(columns=self.columns())
+            return pd.read_csv(file, header=None, names=self.columns(), nrows=count, encoding="utf-8")
@@ -0,0 +1,272 @@
+import re
+import pandas as pd
+
+# Integer types from smallest to largest: (name, signed min, signed max, unsigned max)
+INTEGER_TYPES = [
+    ("TINYINT", -2**7, 2**7 - 1, 2**8 - 1),
+    ("SMALLINT", -2**15, 2**15 - 1, 2**16 - 1),
+    ("MEDIUMINT", -2**23, 2**23 - 1, 2**24 - 1),
+    ("INT", -2**31, 2**31 - 1, 2**32 - 1),
+    ("BIGINT", -2**63, 2**63 - 1, 2**64 - 1),
+]
+
+# DECIMAL limits; floats needing more digits than this are stored as DOUBLE
+MAX_DECIMAL_PRECISION = 65
+MAX_DECIMAL_SCALE = 30
+MAX_FLOAT_SCALE = 10
+
+# String columns with at most this many distinct values, each repeated on average
+# at least MIN_ENUM_REPEAT times, become ENUM
+MAX_ENUM_VALUES = 16
+MIN_ENUM_REPEAT = 10
+MAX_ENUM_LENGTH = 64
+
+# Largest magnitude a MySQL TIME column holds
+MAX_TIME = pd.Timedelta(hours=838, minutes=59, seconds=59)
+
+# Longest string stored as VARCHAR; longer columns become TEXT types
+MAX_VARCHAR = 1024
+
+# InnoDB row size limit in bytes (VARCHAR counts 4 bytes per utf8mb4 character)
+ROW_SIZE_LIMIT = 65535
+
+INTEGER_PATTERN = re.compile(r"^(tinyint|smallint|mediumint|int|bigint)(\(\d+\))?( unsigned)?$", re.IGNORECASE)
+VARCHAR_PATTERN = re.compile(r"^varchar\((\d+)\)$", re.IGNORECASE)
+ENUM_MEMBER_PATTERN = re.compile(r"'((?:[^']|'')*)'")
+DECIMAL_PATTERN = re.compile(r"^decimal\((\d+),(\d+)\)", re.IGNORECASE)
+TEMPORAL_PATTERN = re.compile(r"^(date|datetime)(\((\d)\))?$", re.IGNORECASE)
+
+# Temporal types from narrowest to widest, as widen() promotes them
+TEMPORAL_TYPES = ["DATE", "DATETIME", "DATETIME(6)"]
+
+# Pandas dtype kinds widen() treats as numbers
+NUMERIC_KINDS = ("integer", "floating", "mixed-integer-float", "decimal", "boolean")
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DATETIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d{1,6})?)?$")
+
+class TypeInference:
+    @staticmethod
+    def infer(df: pd.DataFrame, sample_rows=None, enum=False):
+        # Pick the tightest MySQL column type for each column; sample_rows limits the scan.
+        # Low-cardinality strings become ENUM only when enum is True, since later rows cannot add members
+        if sample_rows and len(df) > sample_rows:
+            df = df.sample(sample_rows, random_state=0)
+
+        types = {col: TypeInference.infer_column(df[col], enum) for col in df.columns}
+        return TypeInference.fit_row_size(types)
+
+    @staticmethod
+    def infer_column(series: pd.Series, enum=False):
+        # Map one column's values to a MySQL type
+        values = series.dropna()
+        if values.empty:
+            return "VARCHAR(255)"
+
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind == "boolean":
+            return "TINYINT(1)"
+        if kind == "integer":
+            return TypeInference._integer_type(int(values.min()), int(values.max()))
+        if kind in ("floating", "mixed-integer-float"):
+            values = values.astype(float)
+            if (values % 1 == 0).all() and values.abs().max() < 2**63:
+                return TypeInference._integer_type(int(values.min()), int(values.max()))
+            return TypeInference._decimal_type(values.astype(str), MAX_FLOAT_SCALE)
+        if kind == "decimal":
+            return TypeInference._decimal_type(values.astype(str), MAX_DECIMAL_SCALE)
+        if kind in ("datetime64", "datetime"):
+            stamps = pd.to_datetime(values)
+            return "DATETIME(6)" if (stamps.dt.microsecond != 0).any() else "DATETIME"
+        if kind == "date":
+            return "DATE"
+        if kind in ("timedelta64", "timedelta"):
+            deltas = pd.to_timedelta(values)
+            if deltas.abs().max() <= MAX_TIME:
+                return "TIME(6)" if (deltas.dt.microseconds != 0).any() else "TIME"
+            return TypeInference._text_type(values.astype(str))
+        return TypeInference._string_type(values.astype(str), enum)
+
+    @staticmethod
+    def _integer_type(low, high):
+        # Smallest integer type holding [low, high], unsigned when nothing is negative
+        for name, signed_min, signed_max, unsigned_max in INTEGER_TYPES:
+            if low >= 0 and high <= unsigned_max:
+                return f"{name} UNSIGNED"
+            if low >= signed_min and high <= signed_max:
+                return name
+        return f"DECIMAL({max(len(str(abs(low))), len(str(abs(high))))},0)"
+
+    @staticmethod
+    def _decimal_type(text: pd.Series, max_scale):
+        # DECIMAL(p,s) wide enough for every value's digits, or DOUBLE if that is impractical
+        text = text.str.lstrip("-")
+        if text.str.contains(r"[^0-9.]", regex=True).any():
+            return "DOUBLE"
+
+        parts = text.str.split(".", n=1, expand=True)
+        integer_digits = parts[0].str.lstrip("0").str.len().max()
+        scale = parts[1].fillna("").str.len().max() if parts.shape[1] > 1 else 0
+        precision = max(int(integer_digits) + int(scale), 1)
+
+        if scale > max_scale or precision > MAX_DECIMAL_PRECISION:
+            return "DOUBLE"
+        return f"DECIMAL({precision},{int(scale)})"
+
+    @staticmethod
+    def _string_type(text: pd.Series, enum=False):
+        # DATE/DATETIME for ISO timestamps, ENUM for low cardinality, else VARCHAR/TEXT
+        if text.str.match(DATE_PATTERN).all():
+            if pd.to_datetime(text, format="%Y-%m-%d", errors="coerce").notna().all():
+                return "DATE"
+        if text.str.match(DATETIME_PATTERN).all():
+            if pd.to_datetime(text, format="ISO8601", errors="coerce").notna().all():
+                return "DATETIME(6)" if text.str.contains(".", regex=False).any() else "DATETIME"
+
+        distinct = text.unique() if enum else []
+        if (enum and len(distinct) <= MAX_ENUM_VALUES and len(text) >= MIN_ENUM_REPEAT * len(distinct)
+                and int(text.str.len().max()) <= MAX_ENUM_LENGTH):
+            members = ", ".join(
+                "'" + value.replace("\\", "\\\\").replace("'", "''") + "'" for value in sorted(distinct)
+            )
+            return f"ENUM({members})"
+        return TypeInference._text_type(text)
+
+    @staticmethod
+    def _text_type(text: pd.Series):
+        # VARCHAR wide enough for the longest value, or the smallest TEXT type holding it
+        max_length = int(text.str.len().max())
+        if max_length <= MAX_VARCHAR:
+            # Round up to a power of two to leave headroom for later appends
+            return f"VARCHAR({max(16, 1 << (max_length - 1).bit_length())})"
+
+        max_bytes = int(text.str.encode("utf-8").str.len().max())
+        if max_bytes <= 2**16 - 1:
+            return "TEXT"
+        if max_bytes <= 2**24 - 1:
+            return "MEDIUMTEXT"
+        return "LONGTEXT"
+
+    @staticmethod
+    def widen(df: pd.DataFrame, column_types):
+        # {column: wider type} for existing integer, DECIMAL, DATE/DATETIME, VARCHAR and ENUM columns
+        # (column_types as reported by the server) that cannot hold every value of df; other columns
+        # are left alone
+        changes = {}
+        for col, column_type in column_types.items():
+            values = df[col].dropna() if col in df.columns else None
+            if values is None or values.empty:
+                continue
+            wider = None
+
+            integer = INTEGER_PATTERN.match(column_type)
+            if integer:
+                kind = pd.api.types.infer_dtype(values, skipna=True)
+                if kind == "boolean":
+                    values = values.astype(int)
+                elif kind in ("floating", "mixed-integer-float", "decimal"):
+                    values = values.astype(float)
+                elif kind != "integer":
+                    continue
+                low, high = TypeInference._integer_range(column_type)
+                if (values % 1 == 0).all() and values.abs().max() < 2**63:
+                    low, high = min(low, int(values.min())), max(high, int(values.max()))
+                    if (low, high) != TypeInference._integer_range(column_type):
+                        wider = TypeInference._integer_type(low, high)
+                else:
+                    # Fractions (or huge values) need a DECIMAL that still holds the integer range
+                    digits = max(len(str(abs(low))), len(str(abs(high))))
+                    wider = TypeInference._widen_decimal(values, digits, 0)
+
+            decimal = DECIMAL_PATTERN.match(column_type)
+            if decimal:
+                precision, scale = int(decimal.group(1)), int(decimal.group(2))
+                wider = TypeInference._widen_decimal(values, precision - scale, scale)
+
+            if TEMPORAL_PATTERN.match(column_type):
+                wider = TypeInference._widen_temporal(values, column_type)
+
+            varchar = VARCHAR_PATTERN.match(column_type)
+            if varchar and int(values.astype(str).str.len().max()) > int(varchar.group(1)):
+                wider = TypeInference._text_type(values.astype(str))
+
+            if column_type.lower().startswith("enum("):
+                members = [m.replace("''", "'") for m in ENUM_MEMBER_PATTERN.findall(column_type)]
+                text = values.astype(str)
+                if not text.isin(members).all():
+                    wider = TypeInference._text_type(pd.concat([text, pd.Series(members, dtype=object)]))
+
+            if wider:
+                changes[col] = wider
+        return changes
+
+    @staticmethod
+    def _widen_decimal(values: pd.Series, digits, scale):
+        # DECIMAL with at least `digits` integer digits and `scale` decimals that holds every value,
+        # DOUBLE when no DECIMAL can, or None if that is the current type (or the values are not numbers)
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind not in NUMERIC_KINDS:
+            return None
+        if kind == "decimal":
+            needed = TypeInference._decimal_type(values.astype(str), MAX_DECIMAL_SCALE)
+        else:
+            needed = TypeInference._decimal_type(values.astype(float).astype(str).str.replace(r"\.0$", "", regex=True),
+                                                 MAX_FLOAT_SCALE)
+        if needed == "DOUBLE":
+            return needed
+
+        needed = DECIMAL_PATTERN.match(needed)
+        new_digits = max(digits, int(needed.group(1)) - int(needed.group(2)))
+        new_scale = max(scale, int(needed.group(2)))
+        if new_scale > MAX_DECIMAL_SCALE or new_digits + new_scale > MAX_DECIMAL_PRECISION:
+            return "DOUBLE"
+        if (new_digits, new_scale) == (digits, scale):
+            return None
+        return f"DECIMAL({new_digits + new_scale},{new_scale})"
+
+    @staticmethod
+    def _widen_temporal(values: pd.Series, column_type):
+        # DATETIME/DATETIME(6) for a DATE or DATETIME column receiving times or fractional seconds,
+        # VARCHAR/TEXT when the values are not timestamps at all, or None if the column holds them
+        match = TEMPORAL_PATTERN.match(column_type)
+        fsp = int(match.group(3) or 0)
+        current = 0 if match.group(1).lower() == "date" else (2 if fsp == 6 else 1)
+
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind in ("datetime64", "datetime"):
+            stamps = pd.to_datetime(values)
+            needed = "DATE" if (stamps == stamps.dt.normalize()).all() else TypeInference.infer_column(values)
+        else:
+            needed = TypeInference.infer_column(values)
+
+        if needed not in TEMPORAL_TYPES:
+            # Keep room for the text MySQL renders the existing values as
+            width = 10 if not current else 19 + (fsp + 1 if fsp else 0)
+            return TypeInference._text_type(pd.concat([values.astype(str), pd.Series(["0" * width])]))
+        if TEMPORAL_TYPES.index(needed) > current:
+            return needed
+        return None
+
+    @staticmethod
+    def _integer_range(column_type):
+        # (min, max) an integer column type can hold
+        match = INTEGER_PATTERN.match(column_type)
+        name = match.group(1).upper()
+        for type_name, signed_min, signed_max, unsigned_max in INTEGER_TYPES:
+            if type_name == name:
+                return (0, unsigned_max) if match.group(3) else (signed_min, signed_max)
+
+    @staticmethod
+    def fit_row_size(types):
+        # Turn the widest VARCHARs into TEXT until the row fits InnoDB's row size limit
+        def width(sql_type):
+            match = re.match(r"VARCHAR\((\d+)\)", sql_type)
+            return int(match.group(1)) * 4 + 2 if match else 12
+
+        types = dict(types)
+        while sum(width(t) for t in types.values()) > ROW_SIZE_LIMIT:
+            widest = max(types, key=lambda col: width(types[col]))
+            if not types[widest].startswith("VARCHAR"):
+                break
+            types[widest] = "TEXT"
+        return types
@@ -0,0 +1,83 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+import mysql.connector
+from mysql.connector.conversion import MySQLConverter
+from Scripts.database import Database
+from Scripts.insert_builder import InsertBuilder
+from main import DEFAULT_HOST, DEFAULT_USER, DEFAULT_PASSWORD, DEFAULT_DATABASE
+
+# Rows in the generated sample table (override with the first argument)
+DEFAULT_ROWS = 200000
+
+# Scratch table used for the optional server round trip
+BENCHMARK_TABLE = "_insert_benchmark"
+
+def sample_frame(rows):
+    # Mixed-type data resembling a typical CSV upload, with some missing values
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "amount": rng.normal(100, 25, rows).round(2),
+        "flag": rng.random(rows) < 0.5,
+        "name": [f"customer's name {i}" for i in range(rows)],
+        "created": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 10**8, rows), unit="s"),
+    })
+    df.loc[df.index % 17 == 0, "amount"] = np.nan
+    df.loc[df.index % 23 == 0, "name"] = None
+    return df
+
+def connector_literals(df):
+    # What to_sql's executemany costs on the client: every value goes through the connector's converter
+    converter = MySQLConverter()
+    rows = []
+    for row in df.astype(object).where(df.notna(), None).itertuples(index=False):
+        values = [converter.quote(converter.escape(converter.to_mysql(value))) for value in row]
+        rows.append(b"(" + b", ".join(values) + b")")
+    return rows
+
+def timed(label, func, *args):
+    # Run func once and print its wall time
+    began = time.perf_counter()
+    func(*args)
+    seconds = time.perf_counter() - began
+    print(f"{label:<32}{seconds:>8.2f} s")
+    return seconds
+
+def server_round_trip(df):
+    # Upload through to_sql and through the literal builder when a server is reachable
+    try:
+        db = Database(DEFAULT_HOST, DEFAULT_USER, DEFAULT_PASSWORD, DEFAULT_DATABASE)
+    except mysql.connector.Error as e:
+        print(f"Skipping server round trip: {e}")
+        return
+
+    try:
+        df.head(0).to_sql(name=BENCHMARK_TABLE, con=db.get_engine(), index=False, if_exists="replace")
+        with db.get_engine().connect() as conn:
+            def to_sql():
+                df.to_sql(name=BENCHMARK_TABLE, con=conn, index=False, if_exists="append", chunksize=1000)
+                conn.commit()
+
+            def insert_builder():
+                db._insert_rows(conn, df, BENCHMARK_TABLE)
+                conn.commit()
+
+            timed("to_sql upload", to_sql)
+            conn.exec_driver_sql(f"TRUNCATE TABLE `{BENCHMARK_TABLE}`")
+            timed("InsertBuilder upload", insert_builder)
+    finally:
+        db.drop_table(BENCHMARK_TABLE)
+        db.close()
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    df = sample_frame(rows)
+    print(f"Rendering {rows} rows as SQL literals")
+
+    baseline = timed("connector conversion (to_sql)", connector_literals, df)
+    vectorized = timed("InsertBuilder.row_literals", InsertBuilder.row_literals, df)
+    print(f"{'speedup':<32}{baseline / vectorized:>8.1f} x")
+
+    server_round_trip(df)
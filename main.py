@@ -7,12 +7,15 @@ DEFAULT_USER = "root"
 DEFAULT_PASSWORD = "password"
 DEFAULT_DATABASE = "schema"
 
+# Files/tables uploaded or downloaded concurrently
+DEFAULT_WORKERS = 4
+
 if __name__ == "__main__":
     # Log in to the database
     db = CLI.login(DEFAULT_HOST, DEFAULT_USER, DEFAULT_PASSWORD, DEFAULT_DATABASE)
 
     if db is not None:
-        manager = DataManager(db)
+        manager = DataManager(db, workers=DEFAULT_WORKERS)
 
         # Main menu loop
         while True:
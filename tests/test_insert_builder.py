@@ -0,0 +1,25 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from Scripts.database import Database
+from Scripts.insert_builder import InsertBuilder
+
+def infile_text(df):
+    # What _write_infile sends to LOAD DATA for df
+    buffer = io.StringIO()
+    Database._write_infile(df, buffer)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("value", [np.inf, -np.inf])
+def test_infinite_values_are_rejected_by_both_encoders(value):
+    df = pd.DataFrame({"amount": [1.5, value]})
+    with pytest.raises(ValueError, match="amount"):
+        InsertBuilder.row_literals(df)
+    with pytest.raises(ValueError, match="amount"):
+        infile_text(df)
+
+def test_missing_floats_are_null_in_both_encoders():
+    df = pd.DataFrame({"amount": [1.5, np.nan]})
+    assert InsertBuilder.row_literals(df).tolist() == ["(1.5)", "(NULL)"]
+    assert infile_text(df) == "1.5\n\\N\n"